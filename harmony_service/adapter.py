@@ -6,46 +6,161 @@ needed.
 
 """
 
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from os import remove
 from os.path import basename
 from os.path import join as path_join
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 from harmony_service_lib import BaseHarmonyAdapter
+from harmony_service_lib.message import Message as HarmonyMessage
 from harmony_service_lib.message import Source as HarmonySource
 from harmony_service_lib.util import download, stage
-from pystac import Asset, Item
+from pystac import Asset, Catalog, Item
 
-from harmony_service.utilities import get_mimetype
+from harmony_service.utilities import get_data_asset, get_mimetype
 from metadata_annotator.annotate import annotate_granule
 
 VARINFO_CONFIG_FILE = 'metadata_annotator/earthdata_varinfo_config.json'
 
+# The maximum number of downloaded input granules, including the one currently
+# being processed. This caps the disk space used by prefetched inputs.
+MAX_PREFETCHED_DOWNLOADS = 4
+
 
 class MetadataAnnotatorAdapter(BaseHarmonyAdapter):
     """Custom adapter for Harmony Metadata Annotator Service."""
 
+    def __init__(
+        self,
+        message: HarmonyMessage,
+        catalog: Catalog | None = None,
+        config=None,
+    ):
+        """Initialise the adapter, with no downloads scheduled yet."""
+        super().__init__(message, catalog=catalog, config=config)
+        self.download_executor: ThreadPoolExecutor | None = None
+        self.download_directory: str | None = None
+        self.pending_download_hrefs: Iterator[str] = iter(())
+        self.queued_catalogs: set[Catalog] = set()
+        self.prefetched_downloads: dict[str, Future] = {}
+
+    def invoke(self):
+        """Process all input STAC items, downloading inputs in the background.
+
+        While one granule is being annotated, the inputs for the following
+        granules in the catalog are downloaded concurrently, so that network
+        latency overlaps with processing. The number of granules downloaded
+        ahead is limited by `MAX_PREFETCHED_DOWNLOADS`.
+
+        If processing fails, downloads that have not started are cancelled,
+        and those in progress are not waited for. These may still be writing
+        to the download directory when it is removed, so errors during that
+        clean-up are ignored.
+
+        """
+        if self.catalog is None:
+            return super().invoke()
+
+        with TemporaryDirectory(ignore_cleanup_errors=True) as download_directory:
+            self.download_directory = download_directory
+            self.download_executor = ThreadPoolExecutor(
+                max_workers=MAX_PREFETCHED_DOWNLOADS
+            )
+
+            try:
+                return super().invoke()
+            finally:
+                self.download_executor.shutdown(wait=False, cancel_futures=True)
+                self.download_executor = None
+                self.download_directory = None
+                self.pending_download_hrefs = iter(())
+                self.queued_catalogs = set()
+                self.prefetched_downloads = {}
+
+    def _process_catalog_recursive(self, catalog: Catalog) -> Catalog:
+        """Process a catalog, first queuing downloads for its items.
+
+        Child catalogs are queued while walking their parent catalog, but a
+        catalog retrieved via a 'next' link is only read when it is processed,
+        so its items are queued at that point.
+
+        """
+        if self.download_executor is not None and catalog not in self.queued_catalogs:
+            self.pending_download_hrefs = chain(
+                self.pending_download_hrefs, self.get_download_hrefs(catalog)
+            )
+            self.schedule_downloads()
+
+        return super()._process_catalog_recursive(catalog)
+
+    def get_download_hrefs(self, catalog: Catalog) -> Iterator[str]:
+        """Lazily yield input hrefs in the order the items will be processed.
+
+        This follows `BaseHarmonyAdapter._process_catalog_recursive`, which
+        processes all child catalogs before the items of a catalog. Items
+        without a data asset are skipped, and will fail when processed.
+
+        """
+        self.queued_catalogs.add(catalog)
+
+        for child_catalog in catalog.get_children():
+            yield from self.get_download_hrefs(child_catalog)
+
+        for item in catalog.get_items():
+            try:
+                data_asset = get_data_asset(item)
+            except StopIteration:
+                continue
+
+            yield data_asset.href
+
+    def schedule_downloads(self):
+        """Start background downloads, up to the maximum number allowed."""
+        while len(self.prefetched_downloads) < MAX_PREFETCHED_DOWNLOADS:
+            href = next(self.pending_download_hrefs, None)
+
+            if href is None:
+                break
+
+            if href not in self.prefetched_downloads:
+                self.prefetched_downloads[href] = self.download_executor.submit(
+                    self.download_input, href, self.download_directory
+                )
+
+    def download_input(self, href: str, destination_directory: str) -> str:
+        """Download a single input granule to the specified directory."""
+        return download(
+            href,
+            destination_directory,
+            logger=self.logger,
+            cfg=self.config,
+            access_token=self.message.accessToken,
+        )
+
     def process_item(self, item: Item, source: HarmonySource) -> Item:
         """Process single input STAC item."""
         with TemporaryDirectory() as working_directory:
+            input_file_path = None
+            prefetched_download = None
+
             try:
                 results = item.clone()
                 results.assets = {}
 
-                asset = next(
-                    item_asset
-                    for item_asset in item.assets.values()
-                    if 'data' in (item_asset.roles or [])
-                )
+                asset = get_data_asset(item)
 
-                # Download the input:
-                input_file_path = download(
-                    asset.href,
-                    working_directory,
-                    logger=self.logger,
-                    cfg=self.config,
-                    access_token=self.message.accessToken,
-                )
+                # Download the input, either retrieving a download already
+                # started in the background, or downloading it directly:
+                prefetched_download = self.prefetched_downloads.pop(asset.href, None)
+
+                if prefetched_download is not None:
+                    input_file_path = prefetched_download.result()
+                else:
+                    input_file_path = self.download_input(asset.href, working_directory)
 
                 # harmony.util.download generates a random SHA256 hash for the
                 # local input file, so the original file name can be reused for
@@ -61,6 +176,15 @@ class MetadataAnnotatorAdapter(BaseHarmonyAdapter):
                     collection_short_name=source.shortName,
                 )
 
+                # The input is no longer needed, so remove it before starting
+                # further downloads, to limit the number of inputs on disk:
+                if prefetched_download is not None:
+                    remove(input_file_path)
+                    input_file_path = None
+
+                if self.download_executor is not None:
+                    self.schedule_downloads()
+
                 # Retrieve MIME type of output:
                 output_mime_type = get_mimetype(output_filename)
 
@@ -86,3 +210,9 @@ class MetadataAnnotatorAdapter(BaseHarmonyAdapter):
             except Exception as exception:
                 self.logger.exception(exception)
                 raise exception
+
+            finally:
+                # Prefetched inputs are not in the working directory, so remove
+                # them explicitly if processing failed before they were removed.
+                if prefetched_download is not None and input_file_path is not None:
+                    remove(input_file_path)
@@ -2,6 +2,8 @@
 
 from mimetypes import guess_type
 
+from pystac import Asset, Item
+
 
 def get_mimetype(file_path: str) -> str:
     """Retrieve MIME type from a file path.
@@ -20,3 +22,12 @@ def get_mimetype(file_path: str) -> str:
         mime_type = 'application/octet-stream'
 
     return mime_type
+
+
+def get_data_asset(item: Item) -> Asset:
+    """Retrieve the first asset in a STAC Item with a 'data' role."""
+    return next(
+        item_asset
+        for item_asset in item.assets.values()
+        if 'data' in (item_asset.roles or [])
+    )
@@ -2,10 +2,13 @@
 
 import os
 import re
-from shutil import copy
+from bisect import bisect_left
+from functools import lru_cache
+from shutil import copy, copymode
 
 import numpy as np
 import xarray as xr
+from netCDF4 import Dataset, Group, Variable
 from varinfo import VarInfoFromNetCDF4
 
 from metadata_annotator.exceptions import (
@@ -24,6 +27,16 @@ from metadata_annotator.history_functions import (
     get_start_index_from_history,
     update_history_metadata,
 )
+from metadata_annotator.varinfo_cache import (
+    CachedVarInfoFromNetCDF4,
+    collection_has_rules,
+)
+
+# Characters with a special meaning in regular expression syntax:
+REGEX_SPECIAL_CHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# Flags of a pattern without global inline flags, such as "(?i)":
+DEFAULT_PATTERN_FLAGS = re.compile('').flags
 
 
 def annotate_granule(
@@ -39,8 +52,17 @@ def annotate_granule(
     groups for granules belonging to the collection the granule is from. If so,
     amend the metadata according to those rules.
 
+    If the collection short name is known, the configuration file is checked
+    for applicable rules first, to avoid parsing granules that will not change.
+
     """
-    granule_varinfo = VarInfoFromNetCDF4(
+    if collection_short_name is not None and not collection_has_rules(
+        varinfo_config_file, collection_short_name
+    ):
+        link_or_copy_file(input_file_name, output_file_name)
+        return
+
+    granule_varinfo = CachedVarInfoFromNetCDF4(
         input_file_name,
         short_name=collection_short_name,
         config_file=varinfo_config_file,
@@ -55,7 +77,55 @@ def annotate_granule(
         amend_in_file_metadata(input_file_name, output_file_name, granule_varinfo)
     else:
         # There are no updates required, so copy the input file as-is:
-        copy(input_file_name, output_file_name)
+        link_or_copy_file(input_file_name, output_file_name)
+
+
+def link_or_copy_file(source_path: str, destination_path: str) -> None:
+    """Place an unmodified copy of the source file at the destination path.
+
+    A hard link is attempted first, as this requires no data to be copied when
+    both paths are on the same file system. Otherwise, the file is copied.
+
+    """
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        # e.g., different file systems, or links not supported.
+        copy_file(source_path, destination_path)
+
+
+def copy_file(source_path: str, destination_path: str) -> None:
+    """Copy the source file to the destination path.
+
+    `os.copy_file_range` is used where available, which allows the kernel to
+    clone the data on file systems that support it. Otherwise, a standard
+    byte-for-byte copy is made. Unlike a hard link, the destination is always a
+    separate file, so it can be modified without altering the source.
+
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with (
+                open(source_path, 'rb') as source,
+                open(destination_path, 'wb') as destination,
+            ):
+                bytes_remaining = os.fstat(source.fileno()).st_size
+                while bytes_remaining > 0:
+                    bytes_copied = os.copy_file_range(
+                        source.fileno(), destination.fileno(), bytes_remaining
+                    )
+                    if bytes_copied == 0:
+                        break
+                    bytes_remaining -= bytes_copied
+
+            if bytes_remaining == 0:
+                copymode(source_path, destination_path)
+                return
+        except OSError:
+            # The kernel or file system does not support this operation.
+            pass
+
+    copy(source_path, destination_path)
 
 
 def amend_in_file_metadata(
@@ -74,11 +144,35 @@ def amend_in_file_metadata(
     to the metadata attributes without impacting `xarray` internal concepts such
     as `xr.Coordinates`.
 
+    If only metadata attributes of existing groups and variables need to be
+    changed, the file is not rewritten. Instead the attributes are edited in
+    place in a copy of the input file. HDF5 files that the `netCDF4` library
+    cannot open for writing are rewritten instead.
+
     """
     items_to_update, variables_to_create = get_matching_groups_and_variables(
         granule_varinfo,
     )
     variables_to_delete = get_variables_to_delete(granule_varinfo)
+
+    if is_attribute_only_update(
+        items_to_update, variables_to_create, variables_to_delete, granule_varinfo
+    ):
+        try:
+            amend_in_file_attributes(
+                input_file_name, output_file_name, items_to_update, granule_varinfo
+            )
+            return
+        except OSError:
+            # The `netCDF4` library cannot write to some HDF5 files, such as
+            # those created with `h5py` without NetCDF-4 dimension metadata.
+            # These are rewritten in full below, replacing the partial output.
+            pass
+
+    # The input file is opened a second time here, as `earthdata-varinfo` only
+    # accepts a file path, which it parses with the `netCDF4` library, while
+    # the DataTree is read via `h5netcdf`. There is no file handle that both
+    # can share.
     with xr.open_datatree(
         input_file_name,
         decode_times=False,
@@ -122,13 +216,122 @@ def amend_in_file_metadata(
 
         update_history_metadata(input_file_name, datatree)
 
-        # Future improvement: It is memory intensive to try and write out the
-        # whole `xarray.DataTree` in one operation. Making this write variables
-        # and group separately reduces the memory usage, but makes the
-        # operation slower. (See Harmony SMAP L2 Gridder implementation)
+        # `DataTree.to_netcdf` writes the tree one group at a time through a
+        # single file handle, so peak memory scales with the largest group,
+        # rather than the whole file. Writing each group with a separate
+        # `Dataset.to_netcdf` call would re-open the output for every group
+        # without reducing memory usage further. Chunk sizes and compression
+        # are retained from the encoding of each input variable, so that the
+        # output has the same storage layout as the input granule.
         datatree.to_netcdf(output_file_name, engine='h5netcdf')
 
 
+def is_attribute_only_update(
+    items_to_update: set[str],
+    variables_to_create: set[str],
+    variables_to_delete: list[str],
+    granule_varinfo: VarInfoFromNetCDF4,
+) -> bool:
+    """Determine if only metadata attributes of existing items need changing.
+
+    This is not the case if any variables need to be created or deleted, as
+    well as dimension variables and their values. Additionally, a `_FillValue`
+    cannot be changed after a variable has been created, so requires the file
+    to be rewritten.
+
+    """
+    return (
+        not variables_to_create
+        and not variables_to_delete
+        and not any(
+            '_FillValue' in granule_varinfo.cf_config.get_metadata_overrides(item)
+            for item in items_to_update
+        )
+    )
+
+
+def amend_in_file_attributes(
+    input_file_name: str,
+    output_file_name: str,
+    items_to_update: set[str],
+    granule_varinfo: VarInfoFromNetCDF4,
+) -> None:
+    """Update metadata attributes in place in a copy of the input file.
+
+    Attribute edits only change the file metadata, so this avoids reading and
+    rewriting all of the data in the file. The `history` and `history_json`
+    global attributes are also updated.
+
+    """
+    copy_file(input_file_name, output_file_name)
+
+    with Dataset(output_file_name, 'r+') as dataset:
+        for item_to_update in items_to_update:
+            attributes_to_update, attributes_to_delete = get_attribute_changes(
+                item_to_update, granule_varinfo
+            )
+
+            if not attributes_to_update and not attributes_to_delete:
+                # Only temporary attributes matched, so avoid opening the item
+                continue
+
+            # All attribute updates for the item are written in a single call
+            netcdf4_item = get_netcdf4_item(dataset, item_to_update)
+            set_netcdf4_attributes(netcdf4_item, attributes_to_update)
+
+            for attribute in attributes_to_delete.intersection(netcdf4_item.ncattrs()):
+                netcdf4_item.delncattr(attribute)
+
+        # The history functions operate on a DataTree, so use an empty one
+        # containing only the global attributes of the file:
+        global_attributes = dataset.__dict__
+        history_datatree = xr.DataTree(xr.Dataset(attrs=global_attributes))
+        update_history_metadata(input_file_name, history_datatree)
+
+        set_netcdf4_attributes(
+            dataset,
+            {
+                attribute_name: attribute_value
+                for attribute_name, attribute_value in history_datatree.attrs.items()
+                if global_attributes.get(attribute_name) is not attribute_value
+            },
+        )
+
+
+def set_netcdf4_attributes(
+    netcdf4_item: Dataset | Group | Variable, attributes: dict
+) -> None:
+    """Write metadata attributes to a group or variable in an open file.
+
+    `setncatts` writes string values as fixed-length NC_CHAR attributes, while
+    rewriting the file with `h5netcdf` writes them as variable-length
+    NC_STRING attributes. String values are written with `setncattr_string`,
+    so that attribute types do not depend on whether the file was rewritten.
+
+    """
+    netcdf4_item.setncatts(
+        {
+            attribute_name: attribute_value
+            for attribute_name, attribute_value in attributes.items()
+            if not isinstance(attribute_value, str)
+        }
+    )
+
+    for attribute_name, attribute_value in attributes.items():
+        if isinstance(attribute_value, str):
+            netcdf4_item.setncattr_string(attribute_name, attribute_value)
+
+
+def get_netcdf4_item(
+    dataset: Dataset, group_or_variable_path: str
+) -> Dataset | Group | Variable:
+    """Retrieve a group or variable from an open NetCDF-4 file via its path."""
+    if group_or_variable_path == '/':
+        return dataset
+
+    return dataset[group_or_variable_path]
+
+
 def get_matching_groups_and_variables(
     granule_varinfo: VarInfoFromNetCDF4,
 ) -> tuple[set[str], set[str]]:
@@ -143,33 +346,148 @@ def get_matching_groups_and_variables(
        with many variables.
     2) Iterating through overrides will also identify missing variables.
 
+    Exact paths (those without regular expression syntax) are matched by
+    finding names they are a prefix of in a sorted list of all group and
+    variable paths, consistent with the `re.match` semantics used by
+    earthdata-varinfo. Exact paths that match nothing are reported as missing.
+    All remaining patterns are then checked against any paths that were not
+    already matched by an exact path.
+
     """
+    exact_paths, regex_patterns = partition_override_patterns(
+        tuple(granule_varinfo.cf_config.metadata_overrides)
+    )
+    all_paths = {*granule_varinfo.groups, *granule_varinfo.variables}
     matches = set()
     missing_variables = set()
 
-    for pattern_string in granule_varinfo.cf_config.metadata_overrides:
-        override_pattern = re.compile(pattern_string)
-        pattern_matches = set(
-            group
-            for group in granule_varinfo.groups
-            if override_pattern.match(group) is not None
+    if exact_paths:
+        sorted_paths = sorted(all_paths)
+
+        for exact_path in exact_paths:
+            prefixed_paths = get_paths_with_prefix(sorted_paths, exact_path)
+
+            if prefixed_paths:
+                matches.update(prefixed_paths)
+            else:
+                missing_variables.add(exact_path)
+
+    if regex_patterns:
+        matches.update(get_paths_matching_patterns(all_paths - matches, regex_patterns))
+
+    return matches, missing_variables
+
+
+def get_paths_matching_patterns(
+    paths: set[str], pattern_strings: tuple[str, ...]
+) -> set[str]:
+    """Find all paths that match any of the regular expression patterns.
+
+    Where possible, the patterns are combined into a single alternation, so
+    that each path is only scanned once. Otherwise, each pattern is checked
+    separately, and each path is only matched against patterns whose literal
+    prefix it begins with, which is a much cheaper check than a regex match.
+    The literal prefix check is only used when patterns are matched
+    separately, where it saves a regex match per pattern for most paths. A
+    combined pattern already checks each path in a single scan.
+
+    """
+    combined_pattern = compile_combined_override_pattern(pattern_strings)
+
+    if combined_pattern is not None:
+        match_pattern = combined_pattern.match
+        return {path for path in paths if match_pattern(path)}
+
+    matching_paths = set()
+
+    for pattern_string in pattern_strings:
+        # An empty prefix (e.g., for ".*") will allow all paths through.
+        literal_prefix = get_literal_prefix(pattern_string)
+        match_pattern = compile_override_pattern(pattern_string).match
+        matching_paths.update(
+            path
+            for path in paths
+            if path.startswith(literal_prefix) and match_pattern(path)
         )
-        pattern_matches.update(
-            set(
-                variable
-                for variable in granule_varinfo.variables
-                if override_pattern.match(variable) is not None
-            )
+
+    return matching_paths
+
+
+@lru_cache(maxsize=256)
+def compile_combined_override_pattern(
+    pattern_strings: tuple[str, ...],
+) -> re.Pattern | None:
+    """Compile override patterns into a single alternation, if possible.
+
+    This is not possible if any pattern contains groups, as named groups
+    cannot be redefined and numbered backreferences would refer to a group in
+    a different pattern, or global inline flags (e.g., "(?i)"), which must be
+    at the start of the whole expression. None is returned in these cases, or
+    if the combined pattern cannot be compiled for any other reason.
+
+    """
+    if not all(map(can_combine_override_pattern, pattern_strings)):
+        return None
+
+    try:
+        return re.compile(
+            '|'.join(f'(?:{pattern_string})' for pattern_string in pattern_strings)
         )
+    except re.error:
+        return None
 
-        matches.update(pattern_matches)
 
-        if len(pattern_matches) == 0 and is_exact_path(pattern_string):
-            missing_variables.add(pattern_string)
+def can_combine_override_pattern(pattern_string: str) -> bool:
+    """Determine if a pattern can be included in a combined alternation."""
+    compiled_pattern = compile_override_pattern(pattern_string)
+    return (
+        compiled_pattern.groups == 0 and compiled_pattern.flags == DEFAULT_PATTERN_FLAGS
+    )
 
-    return matches, missing_variables
 
+@lru_cache(maxsize=256)
+def partition_override_patterns(
+    pattern_strings: tuple[str, ...],
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Separate override patterns into exact paths and regular expressions."""
+    exact_paths = tuple(filter(is_exact_path, pattern_strings))
+    regex_patterns = tuple(
+        pattern_string
+        for pattern_string in pattern_strings
+        if not is_exact_path(pattern_string)
+    )
+    return exact_paths, regex_patterns
+
+
+def get_paths_with_prefix(sorted_paths: list[str], prefix: str) -> list[str]:
+    """Find all paths in a sorted list that start with the given prefix.
+
+    All such paths are contiguous in the sorted list, starting at the position
+    the prefix would be inserted.
+
+    """
+    start_index = bisect_left(sorted_paths, prefix)
+    end_index = start_index
 
+    while end_index < len(sorted_paths) and sorted_paths[end_index].startswith(prefix):
+        end_index += 1
+
+    return sorted_paths[start_index:end_index]
+
+
+@lru_cache(maxsize=1024)
+def compile_override_pattern(pattern_string: str) -> re.Pattern:
+    """Compile a pattern from the earthdata-varinfo configuration, caching it.
+
+    The configured patterns, for metadata overrides and excluded science
+    variables, are static for the lifetime of the service, so compiling them
+    once avoids repeating that work for every variable and granule.
+
+    """
+    return re.compile(pattern_string)
+
+
+@lru_cache(maxsize=1024)
 def is_exact_path(pattern_string: str) -> bool:
     """Determine if the string is an exact path.
 
@@ -181,13 +499,65 @@ def is_exact_path(pattern_string: str) -> bool:
     that the string is a regular expression.
 
     """
-    return re.escape(pattern_string) == pattern_string
+    return REGEX_SPECIAL_CHARACTERS.search(pattern_string) is None
+
+
+@lru_cache(maxsize=1024)
+def get_literal_prefix(pattern_string: str) -> str:
+    """Return the literal string that all matches of the pattern begin with.
+
+    This is the text before the first regular expression special character,
+    excluding the preceding character if the special character is a
+    quantifier that may make it optional. An empty string is returned if the
+    pattern has a top-level alternation, as alternatives need not share a
+    prefix.
+
+    """
+    if has_top_level_alternation(pattern_string):
+        return ''
+
+    special_character = REGEX_SPECIAL_CHARACTERS.search(pattern_string)
+
+    if special_character is None:
+        return pattern_string
+
+    prefix_end = special_character.start()
+
+    if special_character.group() in '?*{':
+        prefix_end = max(prefix_end - 1, 0)
+
+    return pattern_string[:prefix_end]
+
+
+def has_top_level_alternation(pattern_string: str) -> bool:
+    """Determine if the pattern has a "|" outside of any group or character set."""
+    depth = 0
+    in_character_set = False
+    characters = iter(pattern_string)
+
+    for character in characters:
+        if character == '\\':
+            # Skip the escaped character:
+            next(characters, None)
+        elif in_character_set:
+            in_character_set = character != ']'
+        elif character == '[':
+            in_character_set = True
+        elif character == '(':
+            depth += 1
+        elif character == ')':
+            depth -= 1
+        elif character == '|' and depth <= 0:
+            return True
+
+    return False
 
 
 def update_metadata_attributes(
     datatree: xr.DataTree,
     group_or_variable_path: str,
     granule_varinfo: VarInfoFromNetCDF4,
+    group_index: dict[str, xr.DataTree] | None = None,
 ) -> None:
     """Update the metadata attributes on the supplied group or variable.
 
@@ -196,37 +566,55 @@ def update_metadata_attributes(
     specific is used. This is defined as the matching rule with the deepest
     specified hierarchy and the shortest specified variable basename.
 
+    If a mapping of group paths to DataTree nodes is supplied, it is used to
+    find the group or variable, instead of resolving the path in the DataTree.
+
+    """
+    attributes_to_update, attributes_to_delete = get_attribute_changes(
+        group_or_variable_path, granule_varinfo
+    )
+
+    # The attributes dictionary is shared with the underlying variable or
+    # group, so it is retrieved once and mutated in place, rather than
+    # constructing a new DataArray for every attribute change.
+    if group_index is None:
+        attributes = datatree[group_or_variable_path].attrs
+    else:
+        attributes = get_attributes_from_index(group_index, group_or_variable_path)
+
+    attributes.update(attributes_to_update)
+
+    for attribute in attributes_to_delete:
+        # Trying to delete a non-existent attribute should not fail
+        attributes.pop(attribute, None)
+
+
+def get_attribute_changes(
+    group_or_variable_path: str, granule_varinfo: VarInfoFromNetCDF4
+) -> tuple[dict, set[str]]:
+    """Return attributes to update and delete for the given group or variable.
+
+    Attributes with an overriding value of None should be deleted. Temporary
+    attributes are neither updated nor deleted.
+
     """
     matching_overrides = granule_varinfo.cf_config.get_metadata_overrides(
         group_or_variable_path,
     )
 
-    temp_attributes = {
-        attribute_name: attribute_value
-        for attribute_name, attribute_value in matching_overrides.items()
-        if is_temporary_attribute(attribute_name)
-    }
-
-    attributes_to_update = {
-        attribute_name: attribute_value
-        for attribute_name, attribute_value in matching_overrides.items()
-        if not is_temporary_attribute(attribute_name) and attribute_value is not None
-    }
-
-    attributes_to_delete = (
-        set(matching_overrides.keys())
-        - set(attributes_to_update.keys())
-        - set(temp_attributes.keys())
-    )
+    attributes_to_update = {}
+    attributes_to_delete = set()
 
-    datatree[group_or_variable_path].attrs.update(attributes_to_update)
+    for attribute_name, attribute_value in matching_overrides.items():
+        if is_temporary_attribute(attribute_name):
+            continue
 
-    for attribute in attributes_to_delete:
-        try:
-            del datatree[group_or_variable_path].attrs[attribute]
-        except KeyError:
-            # Trying to delete a non-existent attribute should not fail
-            pass
+        if attribute_value is None:
+            attributes_to_delete.add(attribute_name)
+        else:
+            attributes_to_update[attribute_name] = attribute_value
+
+    return attributes_to_update, attributes_to_delete
 
 
 def is_temporary_attribute(attribute_name: str) -> bool:
@@ -244,12 +632,20 @@ def update_group_and_variable_attributes(
     items_to_update: set[str],
     granule_varinfo: VarInfoFromNetCDF4,
 ) -> None:
-    """Update attributes for existing variables and groups based on configuration."""
+    """Update attributes for existing variables and groups based on configuration.
+
+    Each group is resolved once, rather than resolving the full path of every
+    item to update in the DataTree.
+
+    """
+    group_index = get_group_index(datatree)
+
     for item_to_update in items_to_update:
         update_metadata_attributes(
             datatree,
             item_to_update,
             granule_varinfo,
+            group_index,
         )
 
 
@@ -268,8 +664,25 @@ def update_dimension_names(datatree: xr.DataTree, variable_to_update: str) -> No
         # Rename from source data dimension names to VarInfo dimension names
         # and limit to the number of dimensions given in rename list.
         source_dims = data_array.dims[: len(rename_dim_list)]
-        rename_dict = dict(zip(source_dims, rename_dim_list))
-        datatree[variable_to_update] = data_array.rename(rename_dict)
+
+        if list(source_dims) == rename_dim_list:
+            # The dimensions already have the configured names.
+            return
+
+        if any(dim in data_array.coords for dim in source_dims):
+            # Coordinates along the renamed dimensions must be renamed as well.
+            rename_dict = {
+                source_dim: target_dim
+                for source_dim, target_dim in zip(source_dims, rename_dim_list)
+                if source_dim != target_dim
+            }
+            datatree[variable_to_update] = data_array.rename(rename_dict)
+        else:
+            # Only the dimension labels change, so relabel a shallow copy of
+            # the underlying variable, avoiding coordinate alignment.
+            renamed_variable = data_array.variable.copy(deep=False)
+            renamed_variable.dims = rename_dim_list
+            datatree[variable_to_update] = renamed_variable
 
 
 def create_new_variable(
@@ -293,18 +706,34 @@ def get_dimension_variables(datatree: xr.DataTree) -> set[str]:
     ToDo: resolve for shared up-level or root-level dimensions
     """
     dimension_variables = set()
-
     for node in datatree.subtree:
-        node_ds = node.dataset
-
-        for data_var in node_ds.data_vars:
-            dimension_variables.update(
-                [f'{node.path}/{dim}' for dim in node_ds[data_var].dims]
-            )
+        # `DataTree.path` is rebuilt from all ancestors on each access:
+        node_path = node.path
+        dimension_variables.update(
+            construct_dim_path(node_path, dim)
+            for dim in get_data_variable_dimensions(node)
+        )
 
     return dimension_variables
 
 
+def get_data_variable_dimensions(node: xr.DataTree) -> set[str]:
+    """Return the distinct dimensions of all data variables in a DataTree node.
+
+    The underlying `xr.Variable` objects are used, to avoid constructing a full
+    `xr.DataArray`, with coordinates, for every data variable.
+
+    """
+    coordinate_names = set(node.coords)
+    return set().union(
+        *(
+            variable.dims
+            for variable_name, variable in node.variables.items()
+            if variable_name not in coordinate_names
+        )
+    )
+
+
 def is_dimension_renaming_required(
     var_info: VarInfoFromNetCDF4, items_to_update: set[str]
 ):
@@ -326,8 +755,9 @@ def get_new_dimension_variables(
     """
     new_dimension_variables = set()
     for node in datatree.subtree:
+        node_path = node.path
         for dim in node.ds.dims:
-            dim_path = construct_dim_path(node.path, dim)
+            dim_path = construct_dim_path(node_path, dim)
             if dim_path in variables_to_create:
                 new_dimension_variables.add(dim_path)
     return new_dimension_variables
@@ -346,10 +776,12 @@ def copy_shared_dimensions_to_parent(
 
     """
     for node in datatree.subtree:
+        # Find the path of each parent once, rather than for every dimension:
+        parents_with_paths = [(parent, parent.path) for parent in node.parents]
         for dim in node.ds.dims:
             dim_src = node.ds[dim]
-            for parent in node.parents:
-                dim_candidate_path = construct_dim_path(parent.path, dim)
+            for parent, parent_path in parents_with_paths:
+                dim_candidate_path = construct_dim_path(parent_path, dim)
                 if dim_candidate_path in variables_to_create:
                     parent.ds = parent.ds.assign({dim: dim_src})
                     break
@@ -423,14 +855,47 @@ def ensure_dimension_node_exists(datatree: xr.DataTree, dimension_path: str) ->
 def get_spatial_dimension_variables(
     datatree: xr.DataTree, variables: set[str] = None
 ) -> set[str]:
-    """Return a set of identified spatial dimension variables."""
+    """Return a set of identified spatial dimension variables.
+
+    Only the metadata attributes are needed, so these are read from the
+    underlying `xr.Variable` in each group, which avoids constructing a full
+    `xr.DataArray`, with coordinates, for every variable.
+
+    """
     valid_dim_standard_names = ('projection_x_coordinate', 'projection_y_coordinate')
-    return set(
-        variable_path
-        for variable_path in variables
-        if datatree[variable_path].attrs.get('standard_name', None)
-        in valid_dim_standard_names
-    )
+    group_index = get_group_index(datatree)
+
+    spatial_dimension_variables = set()
+
+    for variable_path in variables:
+        variable = get_variable_from_index(group_index, variable_path)
+        if variable.attrs.get('standard_name', None) in valid_dim_standard_names:
+            spatial_dimension_variables.add(variable_path)
+
+    return spatial_dimension_variables
+
+
+def get_group_index(datatree: xr.DataTree) -> dict[str, xr.DataTree]:
+    """Return a mapping from the full path of each group to its DataTree node."""
+    return {node.path: node for node in datatree.subtree}
+
+
+def get_variable_from_index(
+    group_index: dict[str, xr.DataTree], variable_path: str
+) -> xr.Variable:
+    """Retrieve a variable using a mapping of group paths to DataTree nodes."""
+    group_path, variable_name = os.path.split(variable_path)
+    return group_index[group_path].variables[variable_name]
+
+
+def get_attributes_from_index(
+    group_index: dict[str, xr.DataTree], group_or_variable_path: str
+) -> dict:
+    """Retrieve the attributes of a group or variable using a group index."""
+    if group_or_variable_path in group_index:
+        return group_index[group_or_variable_path].attrs
+
+    return get_variable_from_index(group_index, group_or_variable_path).attrs
 
 
 def update_spatial_dimension_values(
@@ -468,7 +933,11 @@ def update_spatial_dimension_values(
             geotransform_config,
         )
 
-        datatree[variable_path] = dim_data_array.copy(data=dimension_scale)
+        # Replace only the underlying variable, retaining its dimensions,
+        # attributes and encoding, without copying the whole DataArray:
+        datatree[variable_path] = dim_data_array.variable.copy(
+            deep=False, data=dimension_scale
+        )
 
 
 def get_grid_start_index(
@@ -518,7 +987,9 @@ def get_start_index_from_row_col_variable(
     if row_col_variable.ndim != 2:
         raise InvalidSubsetIndexShape(subset_index_reference)
 
-    return row_col_variable.values[0][0]
+    # Index the variable before retrieving values, so that only the first
+    # element is read from the file, rather than the whole array.
+    return row_col_variable[0, 0].item()
 
 
 def get_spatial_dimension_type(data_array: xr.DataArray) -> str:
@@ -580,7 +1051,7 @@ def get_variables_to_delete(
 
 def is_excluded_science_variable(var_info: VarInfoFromNetCDF4, var) -> bool:
     """Returns True if variable is explicitly excluded by VarInfo configuration."""
-    exclusions_pattern = re.compile(
+    exclusions_pattern = compile_override_pattern(
         '|'.join(var_info.cf_config.excluded_science_variables)
     )
     return var_info.variable_is_excluded(var, exclusions_pattern)
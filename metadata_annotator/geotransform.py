@@ -1,13 +1,14 @@
 """Info particular to creating dimension scales from a geotransform."""
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 import numpy as np
 
 from metadata_annotator.exceptions import InvalidSpatialDimensionType
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Geotransform:
     """Class for holding a GDAL-style 6-element geotransform."""
 
@@ -18,8 +19,15 @@ class Geotransform:
     column_rotation: np.float64
     pixel_height: np.float64
 
-    def col_row_to_xy(self, col: int, row: int) -> tuple[np.float64, np.float64]:
-        """Convert grid cell location to x,y coordinate."""
+    def col_row_to_xy(
+        self, col: int | np.ndarray, row: int | np.ndarray
+    ) -> tuple[np.float64 | np.ndarray, np.float64 | np.ndarray]:
+        """Convert grid cell location to x,y coordinate.
+
+        Either of the column or row may also be a NumPy array of indices, in
+        which case the corresponding coordinates are returned as arrays.
+
+        """
         # Geotransform is defined from upper left corner as (0,0), so adjust
         # input value to the center of grid at (.5, .5)
         adj_col = col + 0.5
@@ -65,27 +73,45 @@ def compute_dimension_scale(
     dimension_value_dtype: str,
     geotransform_config: list,
 ) -> np.ndarray:
-    """Compute the dimension scale from the given geotransform configuration."""
+    """Compute the dimension scale from the given geotransform configuration.
+
+    Dimension variables that share a grid have the same dimension scale, so
+    the computed values are cached. The returned array is shared between
+    callers, and so is read-only.
+
+    """
+    return get_cached_dimension_scale(
+        start_index,
+        dim_size,
+        spatial_dimension_type,
+        dimension_value_dtype,
+        tuple(geotransform_config),
+    )
+
+
+@lru_cache(maxsize=32)
+def get_cached_dimension_scale(
+    start_index: int,
+    dim_size: int,
+    spatial_dimension_type: str,
+    dimension_value_dtype: str,
+    geotransform_config: tuple,
+) -> np.ndarray:
+    """Compute a read-only dimension scale for hashable input parameters."""
     geotransform = geotransform_from_config(geotransform_config)
+    indices = np.arange(start_index, start_index + dim_size)
 
-    # compute the x,y locations along a column and row
+    # compute the x,y locations along a column and row, converting all grid
+    # cell indices in a single vectorised calculation
     if spatial_dimension_type == 'x':
-        column_dimensions = [
-            geotransform.col_row_to_xy(i, 0)
-            for i in range(start_index, start_index + dim_size)
-        ]
-        dimension_scale = np.array(
-            [x for x, y in column_dimensions], dtype=np.dtype(dimension_value_dtype)
-        )
+        dimension_scale, _ = geotransform.col_row_to_xy(indices, 0)
     elif spatial_dimension_type == 'y':
-        row_dimensions = [
-            geotransform.col_row_to_xy(0, i)
-            for i in range(start_index, start_index + dim_size)
-        ]
-        dimension_scale = np.array(
-            [y for x, y in row_dimensions], dtype=np.dtype(dimension_value_dtype)
-        )
+        _, dimension_scale = geotransform.col_row_to_xy(0, indices)
     else:
         raise InvalidSpatialDimensionType(spatial_dimension_type)
 
+    dimension_scale = dimension_scale.astype(
+        np.dtype(dimension_value_dtype), copy=False
+    )
+    dimension_scale.flags.writeable = False
     return dimension_scale
@@ -3,8 +3,9 @@
 import json
 import os
 import re
-from datetime import datetime, timezone
-from urllib.parse import parse_qs, unquote
+from datetime import UTC, datetime
+from functools import lru_cache
+from urllib.parse import unquote, unquote_plus
 
 import xarray as xr
 from varinfo import VarInfoFromNetCDF4
@@ -18,6 +19,9 @@ HISTORY_JSON_SCHEMA = (
 PROGRAM = 'Harmony Metadata Annotator'
 PROGRAM_REF = 'https://github.com/nasa/harmony-metadata-annotator'
 
+# Pattern for each index range, in square brackets, from a subset history entry
+INDEX_RANGE_PATTERN = re.compile(r'\[(.*?)\]')
+
 
 def update_history_metadata(input_file_name: str, datatree: xr.DataTree) -> None:
     """Update the history-related metadata global attribute of the DataTree.
@@ -61,33 +65,29 @@ def update_history_metadata(input_file_name: str, datatree: xr.DataTree) -> None
     datatree.attrs['history_json'] = json.dumps(output_history_json)
 
     # Create a new history for Metadata Annotator history
-    new_history_line = ' '.join(
-        [
-            new_history_json_record['date_time'],
-            new_history_json_record['program'],
-            new_history_json_record['version'],
-        ]
+    new_history_line = (
+        f'{new_history_json_record["date_time"]} '
+        f'{new_history_json_record["program"]} '
+        f'{new_history_json_record["version"]}'
     )
 
-    # Append new Metadata Annotator history to existing history
-    output_history = '\n'.join(filter(None, [existing_history, new_history_line]))
-
-    # Update history attribute with new Metadata Annotator entry
-    datatree.attrs[history_attribute_name] = output_history
+    # Append new Metadata Annotator history to existing history, and update
+    # the history attribute with the new Metadata Annotator entry
+    datatree.attrs[history_attribute_name] = (
+        f'{existing_history}\n{new_history_line}'
+        if existing_history
+        else new_history_line
+    )
 
 
 def read_history_attrs(datatree: xr.DataTree) -> tuple[str, str]:
-    """Read history attribute."""
-    if 'History' in datatree.attrs:
-        history_attribute_name = 'History'
-        existing_history = datatree.attrs['History']
-    elif 'history' in datatree.attrs:
-        history_attribute_name = 'history'
-        existing_history = datatree.attrs['history']
-    else:
-        history_attribute_name = 'history'
-        existing_history = None
-    return history_attribute_name, existing_history
+    """Read history attribute, preferring `History` over `history`."""
+    existing_history = datatree.attrs.get('History')
+
+    if existing_history is not None:
+        return 'History', existing_history
+
+    return 'history', datatree.attrs.get('history')
 
 
 def get_request_url_attribute(input_file_name: str, datatree: xr.DataTree) -> str:
@@ -159,7 +159,7 @@ def create_history_json_record(granule_url: str) -> dict:
     """
     history_json_record = {
         '$schema': HISTORY_JSON_SCHEMA,
-        'date_time': datetime.now(timezone.utc).isoformat(),
+        'date_time': datetime.now(UTC).isoformat(),
         'program': PROGRAM,
         'version': get_semantic_version(),
         'derived_from': granule_url,
@@ -209,9 +209,7 @@ def get_start_index_from_history(
     dimension_index_map: dict[str, int], dimension_variable_path: str
 ) -> int:
     """Return the start index from the dimension index map."""
-    if dimension_variable_path in dimension_index_map.keys():
-        return dimension_index_map[dimension_variable_path]
-    return 0
+    return dimension_index_map.get(dimension_variable_path, 0)
 
 
 def get_dimension_index_map(
@@ -220,12 +218,17 @@ def get_dimension_index_map(
     granule_var_info: VarInfoFromNetCDF4,
 ) -> dict[str, int]:
     """Return dimension path to start index mapping."""
-    # Check that all dimension variables exist in the datatree
+    # Check that all dimension variables exist in the datatree. Only the
+    # containing group is retrieved, to avoid constructing a DataArray:
     for dim in dimension_variables:
+        group_path, dimension_name = os.path.split(dim)
         try:
-            datatree[dim]
+            group = datatree[group_path]
         except KeyError as e:
-            raise MissingDimensionVariable(str(e)) from e
+            raise MissingDimensionVariable(dim) from e
+
+        if dimension_name not in group.variables:
+            raise MissingDimensionVariable(dim)
 
     if not any(
         granule_var_info.get_missing_variable_attributes(dim).get(
@@ -259,14 +262,14 @@ def parse_start_indices_from_history_attr(datatree: xr.DataTree) -> dict[str, st
     if not existing_history:
         return {}
 
-    decoded_string = unquote(existing_history)
-    parsed_data = parse_qs(decoded_string)
-    opendap_entry = next(iter(parsed_data.values()), ())
+    opendap_entry = get_first_query_value(unquote(existing_history))
+
+    _, separator, constraint_expression = opendap_entry.partition('=')
 
-    if not opendap_entry:
+    if not separator:
         return {}
 
-    index_range_entries = ((opendap_entry[0].split('=')[1]).rstrip()).split(';')
+    index_range_entries = constraint_expression.split('=')[0].rstrip().split(';')
     variable_start_indices_map = {}
     for entry in index_range_entries:
         variable, dim_indices = get_index_range_substring(entry)
@@ -275,6 +278,23 @@ def parse_start_indices_from_history_attr(datatree: xr.DataTree) -> dict[str, st
     return variable_start_indices_map
 
 
+def get_first_query_value(query_string: str) -> str:
+    """Return the first non-empty value from a URL query string.
+
+    This matches the first value that `urllib.parse.parse_qs` would return,
+    but stops at the first match, rather than parsing the whole string, which
+    may be a long, multi-line history attribute. An empty string is returned
+    if there is no such value.
+
+    """
+    for query_parameter in query_string.split('&'):
+        _, separator, value = query_parameter.partition('=')
+        if separator and value:
+            return unquote_plus(value)
+
+    return ''
+
+
 def get_variable_dimension_map(
     granule_var_info: VarInfoFromNetCDF4,
     datatree: xr.DataTree,
@@ -288,7 +308,7 @@ def get_variable_dimension_map(
     earthdata-varinfo supports up-level dimensions.
     """
     var_dim_map = {
-        dimlist: list(varlist)[0]
+        dimlist: next(iter(varlist))
         for dimlist, varlist in granule_var_info.group_variables_by_dimensions().items()
     }
 
@@ -348,40 +368,33 @@ def get_dim_index_from_var_dim_map(
 
 def get_index_range_substring(index_range_string: str) -> tuple[str, list]:
     """Return variable and index range."""
-    variable = ''
     if not index_range_string:
-        return variable, []
-
-    start_index = -1
-    end_index = -1
-    start_char = '['
-    end_char = ']'
-
-    # Gets the index to the starting char '[' for the index ranges.
-    for i, char in enumerate(index_range_string):
-        if char == start_char:
-            start_index = i
-            break
+        return '', []
 
-    # Gets the index to the ending char ']' for the index ranges.
-    for i in reversed(range(len(index_range_string))):
-        if index_range_string[i] == end_char:
-            end_index = i
-            break
+    # Gets the index to the starting char '[' and ending char ']' for the
+    # index ranges.
+    start_index = index_range_string.find('[')
+    end_index = index_range_string.rfind(']')
 
     if start_index != -1 and end_index != -1 and start_index <= end_index:
         # The variable is before the index range start.
         variable = index_range_string[0:start_index]
         # Get all the index ranges in square brackets
-        index_range_dims = re.findall(
-            r'\[(.*?)\]', index_range_string[start_index : end_index + 1]
+        index_range_dims = INDEX_RANGE_PATTERN.findall(
+            index_range_string, start_index, end_index + 1
         )
         return variable, index_range_dims
-    return variable, []
+    return '', []
 
 
+@lru_cache(maxsize=1)
 def get_semantic_version() -> str:
-    """Parse the service_version.txt to get the semantic version number."""
+    """Parse the service_version.txt to get the semantic version number.
+
+    The version is static for the lifetime of the service, so the file is only
+    read once, rather than for every granule.
+
+    """
     current_directory = os.path.dirname(os.path.abspath('__file__'))
     path = os.path.join(current_directory, 'docker/service_version.txt')
     with open(path, encoding='utf-8') as file_handler:
@@ -0,0 +1,171 @@
+"""Caching of earthdata-varinfo configuration parsing between granules.
+
+The earthdata-varinfo configuration file is static for the lifetime of the
+service, but `VarInfoFromNetCDF4` reads and parses it for every granule. The
+class in this module reuses the parsed configuration, so only the inspection of
+the granule itself is repeated for each input file.
+
+With this caching, the configuration file is parsed once for the VarInfo
+configuration, and once for each collection processed by the service (in
+`CFConfig`, which only accepts a file path). The standard library `json` module
+is therefore sufficient, and no faster third-party parser is needed.
+
+"""
+
+import json
+import re
+from functools import lru_cache
+from os.path import exists, getmtime
+
+from varinfo import CFConfig, VarInfoFromNetCDF4
+
+
+class CachedVarInfoFromNetCDF4(VarInfoFromNetCDF4):
+    """A `VarInfoFromNetCDF4` that reuses parsed configuration file contents.
+
+    Cached values are keyed on the modification time of the configuration
+    file, so any changes to the file will be picked up.
+
+    The overridden methods are private to `VarInfoBase`, so earthdata-varinfo
+    is pinned to the exact version these overrides have been tested with.
+
+    """
+
+    def _set_var_info_config(self):
+        """Retrieve the cached VarInfo configuration, if the file is valid.
+
+        Missing or invalid configuration files are handled by the parent class,
+        so that the expected exceptions are raised.
+
+        """
+        if (
+            self.config_file is not None
+            and self.config_file.endswith('.json')
+            and exists(self.config_file)
+        ):
+            self.var_info_config = read_varinfo_config(
+                self.config_file, getmtime(self.config_file)
+            )
+        else:
+            super()._set_var_info_config()
+
+    def _set_cf_config(self) -> CFConfig:
+        """Retrieve the cached CFConfig for the granule mission and short name."""
+        if self.config_file is None:
+            return super()._set_cf_config()
+
+        return get_cf_config(
+            self.mission,
+            self.short_name,
+            self.config_file,
+            getmtime(self.config_file),
+        )
+
+
+class CachedCFConfig(CFConfig):
+    """A `CFConfig` that reuses the metadata overrides found for each path.
+
+    Determining the overrides for a path matches it against every configured
+    pattern and sorts the results by specificity. The same paths are queried
+    many times: when parsing each granule, and again when annotating it. The
+    configuration does not change once read, so the overrides for each path
+    are retained for the lifetime of the instance.
+
+    The returned dictionaries are shared between callers, and must not be
+    mutated.
+
+    """
+
+    def __init__(
+        self,
+        mission: str | None,
+        collection_short_name: str | None,
+        config_file: str | None = None,
+    ):
+        """Read the configuration file, with no overrides retrieved yet."""
+        self.metadata_overrides_cache: dict[str, dict] = {}
+        super().__init__(mission, collection_short_name, config_file)
+
+    def get_metadata_overrides(self, variable_path: str) -> dict:
+        """Return the cached metadata overrides for the group or variable."""
+        if variable_path not in self.metadata_overrides_cache:
+            self.metadata_overrides_cache[variable_path] = (
+                super().get_metadata_overrides(variable_path)
+            )
+
+        return self.metadata_overrides_cache[variable_path]
+
+
+def collection_has_rules(config_file: str | None, short_name: str) -> bool:
+    """Determine if the configuration has any rules for the collection.
+
+    This only needs the parsed configuration file, so can be checked before
+    any granule is parsed. True is returned if the configuration file cannot
+    be read here, so that the full parsing of the granule will raise the
+    expected exceptions.
+
+    """
+    if (
+        config_file is None
+        or not config_file.endswith('.json')
+        or not exists(config_file)
+    ):
+        return True
+
+    return has_rules_for_short_name(config_file, getmtime(config_file), short_name)
+
+
+@lru_cache(maxsize=256)
+def has_rules_for_short_name(
+    config_file: str, modification_time: float, short_name: str
+) -> bool:
+    """Determine if a readable configuration has rules for the collection.
+
+    The result only depends on the configuration file contents, so is cached
+    for each collection, avoiding matching the short name against all mission
+    patterns for every granule.
+
+    """
+    var_info_config = read_varinfo_config(config_file, modification_time)
+
+    # Match the short name to a mission, as done by `VarInfoFromNetCDF4`:
+    mission = next(
+        (
+            mission_name
+            for pattern, mission_name in var_info_config.get('Mission', {}).items()
+            if re.match(pattern, short_name) is not None
+        ),
+        None,
+    )
+
+    cf_config = get_cf_config(mission, short_name, config_file, modification_time)
+
+    return bool(cf_config.metadata_overrides or cf_config.excluded_science_variables)
+
+
+@lru_cache(maxsize=32)
+def read_varinfo_config(config_file: str, modification_time: float) -> dict:
+    """Read and parse the earthdata-varinfo configuration JSON file.
+
+    The modification time is not used directly, but ensures that the cached
+    value is refreshed if the configuration file is changed.
+
+    """
+    with open(config_file, encoding='utf-8') as file_handler:
+        return json.load(file_handler)
+
+
+@lru_cache(maxsize=256)
+def get_cf_config(
+    mission: str | None,
+    short_name: str | None,
+    config_file: str,
+    modification_time: float,
+) -> CFConfig:
+    """Create a CachedCFConfig with the rules for the specified collection.
+
+    The modification time is not used directly, but ensures that the cached
+    value is refreshed if the configuration file is changed.
+
+    """
+    return CachedCFConfig(mission, short_name, config_file)
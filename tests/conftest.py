@@ -3,8 +3,7 @@
 import json
 from datetime import datetime
 from os.path import join as path_join
-from shutil import copy, move, rmtree
-from tempfile import mkdtemp
+from shutil import copy
 
 import numpy as np
 import xarray as xr
@@ -23,11 +22,25 @@ from metadata_annotator.history_functions import (
 
 
 @fixture(scope='function')
-def temp_dir() -> str:
-    """A temporary directory for test isolation."""
-    temp_directory = mkdtemp()
-    yield temp_directory
-    rmtree(temp_directory)
+def temp_dir(tmp_path) -> str:
+    """A temporary directory for test isolation.
+
+    This is managed by pytest, which removes old temporary directories in bulk
+    in later sessions, rather than after every test.
+
+    """
+    return str(tmp_path)
+
+
+@fixture(scope='module')
+def module_temp_dir(tmp_path_factory) -> str:
+    """A temporary directory for files shared by all tests in a module.
+
+    Fixture files in this directory must not be modified by tests. Outputs
+    should be written to `temp_dir` instead.
+
+    """
+    return str(tmp_path_factory.mktemp('module'))
 
 
 @fixture(scope='function')
@@ -36,15 +49,22 @@ def temp_output_file_path(temp_dir) -> str:
     return path_join(temp_dir, 'annotated_output.nc')
 
 
-@fixture(scope='function')
-def varinfo_config_file(temp_dir) -> str:
-    """Return file path of configuration file."""
-    config_path = path_join(temp_dir, 'earthdata_varinfo_test_config.json')
+@fixture(scope='session')
+def varinfo_config_file(tmp_path_factory) -> str:
+    """Return file path of configuration file.
+
+    The configuration file is not modified by tests, so a single copy is used
+    for the whole test session.
+
+    """
+    config_path = path_join(
+        tmp_path_factory.mktemp('configuration'), 'earthdata_varinfo_test_config.json'
+    )
     copy('tests/data/earthdata_varinfo_test_config.json', config_path)
     return config_path
 
 
-@fixture(scope='function')
+@fixture(scope='module')
 def sample_varinfo(sample_netcdf4_file, varinfo_config_file) -> VarInfoFromNetCDF4:
     """Create sample VarInfoFromNetCDF4 instance."""
     return VarInfoFromNetCDF4(
@@ -52,10 +72,10 @@ def sample_varinfo(sample_netcdf4_file, varinfo_config_file) -> VarInfoFromNetCD
     )
 
 
-@fixture(scope='function')
-def sample_netcdf4_file(temp_dir) -> str:
+@fixture(scope='module')
+def sample_netcdf4_file(module_temp_dir) -> str:
     """Create a sample NetCDF-4 file."""
-    file_name = path_join(temp_dir, 'test_input.nc')
+    file_name = path_join(module_temp_dir, 'test_input.nc')
 
     sample_datatree = xr.DataTree(
         dataset=xr.Dataset(
@@ -112,10 +132,10 @@ def sample_netcdf4_file(temp_dir) -> str:
     return file_name
 
 
-@fixture(scope='function')
-def expected_output_netcdf4_file(temp_dir) -> str:
+@fixture(scope='module')
+def expected_output_netcdf4_file(module_temp_dir) -> str:
     """NetCDF-4 file with metadata updated per earthdata-varinfo config file."""
-    file_name = path_join(temp_dir, 'expected_output.nc')
+    file_name = path_join(module_temp_dir, 'expected_output.nc')
 
     sample_datatree = xr.DataTree(
         dataset=xr.Dataset(
@@ -202,25 +222,81 @@ def downloaded_netcdf4_file(temp_dir, sample_netcdf4_file) -> str:
 
     This makes the downloaded filename distinct from the STAC Asset.href, so
     that errors do not occur when trying to copy the file to its own location.
+    The shared sample file is copied, so that it is still available to other
+    tests in the module.
 
     """
     downloaded_file_name = path_join(temp_dir, 'SHA256_scramble.nc')
-    move(sample_netcdf4_file, downloaded_file_name)
+    copy(sample_netcdf4_file, downloaded_file_name)
     return downloaded_file_name
 
 
+@fixture(scope='session')
+def spl3ftp_source_datatree() -> xr.DataTree:
+    """The sample SPL3FTP granule, opened once for all tests.
+
+    Tests should use `spl3ftp_datatree` instead, so that any changes made by
+    one test are not seen by others.
+
+    """
+    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
+        yield datatree
+
+
+@fixture(scope='function')
+def spl3ftp_datatree(spl3ftp_source_datatree) -> xr.DataTree:
+    """A copy of the sample SPL3FTP granule that a test can modify.
+
+    The copy is shallow, but with new nodes, variables and attributes, so only
+    the underlying (lazily loaded) array data is shared between tests.
+
+    """
+    return spl3ftp_source_datatree.copy()
+
+
+@fixture(scope='session')
+def spl3ftp_varinfo() -> VarInfoFromNetCDF4:
+    """A VarInfoFromNetCDF4 instance for the sample SPL3FTP granule.
+
+    This uses the service configuration file, and is only read by tests.
+
+    """
+    return VarInfoFromNetCDF4(
+        'tests/data/SC_SPL3FTP_spatially_subsetted.nc4',
+        short_name='SPL3FTP',
+        config_file='metadata_annotator/earthdata_varinfo_config.json',
+    )
+
+
+@fixture(scope='function')
+def adapter_temp_dir(temp_dir, mocker) -> str:
+    """The test temporary directory, used as the adapter working directory."""
+    temp_dir_mock = mocker.patch('harmony_service.adapter.TemporaryDirectory')
+    temp_dir_mock.return_value.__enter__.return_value = temp_dir
+    return temp_dir
+
+
+@fixture(scope='function')
+def stage_mock(mocker):
+    """A mock for staging adapter outputs, returning a fixed staged location."""
+    stage_mock = mocker.patch('harmony_service.adapter.stage')
+    stage_mock.return_value = 's3://bucketname/staged-location'
+    return stage_mock
+
+
 @fixture(scope='session')
 def stac_asset_href() -> str:
     """Return a URL for a STAC Asset."""
     return 'https://www.example.com/test_input.nc'
 
 
-@fixture(scope='session')
+@fixture(scope='function')
 def sample_stac(stac_asset_href) -> Catalog:
     """Create a sample SpatioTemporal Asset Catalog (STAC).
 
     Spatial and temporal information is not used by the service, so default
-    values are used.
+    values are used. The catalog is passed to the adapter, which could alter
+    its links, so a new catalog is made for each test.
 
     """
     catalog = Catalog(id='input catalog', description='test input')
@@ -260,10 +336,10 @@ def sample_harmony_message() -> HarmonyMessage:
     )
 
 
-@fixture(scope='function')
-def sample_netcdf4_file_test02(temp_dir) -> str:
+@fixture(scope='module')
+def sample_netcdf4_file_test02(module_temp_dir) -> str:
     """Create a sample NetCDF-4 file."""
-    file_name = path_join(temp_dir, 'test_input_02.nc')
+    file_name = path_join(module_temp_dir, 'test_input_02.nc')
 
     sample_datatree = xr.DataTree(
         dataset=xr.Dataset(
@@ -320,7 +396,7 @@ def sample_netcdf4_file_test02(temp_dir) -> str:
     return file_name
 
 
-@fixture(scope='function')
+@fixture(scope='module')
 def sample_varinfo_test02(
     sample_netcdf4_file_test02, varinfo_config_file
 ) -> VarInfoFromNetCDF4:
@@ -330,10 +406,10 @@ def sample_varinfo_test02(
     )
 
 
-@fixture(scope='function')
-def sample_netcdf4_file_test03(temp_dir) -> str:
+@fixture(scope='module')
+def sample_netcdf4_file_test03(module_temp_dir) -> str:
     """Create a sample NetCDF-4 file to test index ranges from history."""
-    file_name = path_join(temp_dir, 'test_input_03.nc')
+    file_name = path_join(module_temp_dir, 'test_input_03.nc')
 
     sample_datatree = xr.DataTree(
         dataset=xr.Dataset(
@@ -370,7 +446,7 @@ def sample_netcdf4_file_test03(temp_dir) -> str:
     return file_name
 
 
-@fixture(scope='function')
+@fixture(scope='module')
 def sample_varinfo_test03(
     sample_netcdf4_file_test03, varinfo_config_file
 ) -> VarInfoFromNetCDF4:
@@ -380,10 +456,10 @@ def sample_varinfo_test03(
     )
 
 
-@fixture(scope='function')
-def sample_netcdf4_file_test05(temp_dir) -> str:
+@fixture(scope='module')
+def sample_netcdf4_file_test05(module_temp_dir) -> str:
     """Create a sample NetCDF-4 file for testing excluding variables."""
-    file_name = path_join(temp_dir, 'test_input_05.nc')
+    file_name = path_join(module_temp_dir, 'test_input_05.nc')
 
     sample_datatree = xr.DataTree(
         xr.Dataset(
@@ -412,15 +488,15 @@ def sample_netcdf4_file_test05(temp_dir) -> str:
     return file_name
 
 
-@fixture(scope='function')
-def expected_output_netcdf4_file_test05(temp_dir) -> str:
+@fixture(scope='module')
+def expected_output_netcdf4_file_test05(module_temp_dir) -> str:
     """Create a sample NetCDF-4 file for testing excluding variables.
 
     The generated file omits the 'string_time_utc_seconds' variable from each group.
     This ensures that the metadata annotator correctly excludes these variables
     from its output during testing.
     """
-    file_name = path_join(temp_dir, 'test_input_05.nc')
+    file_name = path_join(module_temp_dir, 'expected_output_05.nc')
 
     sample_datatree = xr.DataTree(
         xr.Dataset(
@@ -446,7 +522,7 @@ def expected_output_netcdf4_file_test05(temp_dir) -> str:
     return file_name
 
 
-@fixture(scope='function')
+@fixture(scope='module')
 def sample_varinfo_test05(
     sample_netcdf4_file_test05, varinfo_config_file
 ) -> VarInfoFromNetCDF4:
@@ -456,10 +532,10 @@ def sample_varinfo_test05(
     )
 
 
-@fixture(scope='function')
-def sample_netcdf4_file_test07(temp_dir) -> str:
+@fixture(scope='module')
+def sample_netcdf4_file_test07(module_temp_dir) -> str:
     """Create a sample NetCDF-4 file."""
-    file_name = path_join(temp_dir, 'test_input.nc')
+    file_name = path_join(module_temp_dir, 'test_input_07.nc')
 
     sample_datatree = xr.DataTree(
         dataset=xr.Dataset(
@@ -5,13 +5,16 @@ VARINFO_CONFIG_FILE global variable.
 
 """
 
+from datetime import datetime
 from os.path import basename
 from os.path import join as path_join
+from pathlib import Path
 
 import pytest
 import xarray as xr
 from freezegun import freeze_time
-from harmony_service_lib.util import config
+from harmony_service_lib.util import bbox_to_geometry, config
+from pystac import Asset, Catalog, Item
 
 import harmony_service.adapter as adapter
 from harmony_service.adapter import MetadataAnnotatorAdapter
@@ -26,14 +29,11 @@ def test_process_item(
     stac_asset_href,
     sample_harmony_message,
     varinfo_config_file,
-    temp_dir,
+    adapter_temp_dir,
+    stage_mock,
     mocker,
 ):
     """Confirm normal processing occurs."""
-    # Override the working directory with temporary test directory
-    temp_dir_mock = mocker.patch('harmony_service.adapter.TemporaryDirectory')
-    temp_dir_mock.return_value.__enter__.return_value = temp_dir
-
     # Override the configuration file with the test configuration file
     mocker.patch.object(adapter, 'VARINFO_CONFIG_FILE', varinfo_config_file)
 
@@ -47,9 +47,6 @@ def test_process_item(
     download_mock = mocker.patch('harmony_service.adapter.download')
     download_mock.return_value = downloaded_netcdf4_file
 
-    stage_mock = mocker.patch('harmony_service.adapter.stage')
-    stage_mock.return_value = 's3://bucketname/staged-location'
-
     get_spatial_dimension_variables_mock = mocker.patch(
         'metadata_annotator.annotate.get_spatial_dimension_variables'
     )
@@ -58,9 +55,7 @@ def test_process_item(
     get_request_url_attribute_mock = mocker.patch(
         'metadata_annotator.history_functions.get_request_url_attribute'
     )
-    get_request_url_attribute_mock.return_value = path_join(
-        temp_dir, 'expected_output.nc'
-    )
+    get_request_url_attribute_mock.return_value = expected_output_netcdf4_file
 
     # Create and run the service
     harmony_config = config(validate=False)
@@ -73,7 +68,7 @@ def test_process_item(
     # Ensure mocked functions to download input and stage output were called
     download_mock.assert_called_once_with(
         stac_asset_href,
-        temp_dir,
+        adapter_temp_dir,
         logger=mocker.ANY,
         cfg=harmony_config,
         access_token=sample_harmony_message.accessToken,
@@ -100,14 +95,13 @@ def test_process_item(
         }
     }
 
-    # Check output file
-    with (
-        xr.open_dataset(sample_netcdf4_file, decode_times=False) as results_datatree,
-        xr.open_dataset(
-            expected_output_netcdf4_file, decode_times=False
-        ) as expected_datatree,
-    ):
-        assert results_datatree.identical(expected_datatree)
+    # Check output file, written to the working directory with the same name as
+    # the STAC Asset:
+    results_dataset = xr.load_dataset(
+        path_join(adapter_temp_dir, basename(stac_asset_href)), decode_times=False
+    )
+    expected_dataset = xr.load_dataset(expected_output_netcdf4_file, decode_times=False)
+    assert results_dataset.identical(expected_dataset)
 
 
 def test_process_item_exception(
@@ -115,14 +109,11 @@ def test_process_item_exception(
     stac_asset_href,
     sample_harmony_message,
     varinfo_config_file,
-    temp_dir,
+    adapter_temp_dir,
+    stage_mock,
     mocker,
 ):
     """Confirm correct exception handling occurs."""
-    # Override the working directory with temporary test directory
-    temp_dir_mock = mocker.patch('harmony_service.adapter.TemporaryDirectory')
-    temp_dir_mock.return_value.__enter__.return_value = temp_dir
-
     # Override the configuration file with the test configuration file
     mocker.patch.object(adapter, 'VARINFO_CONFIG_FILE', varinfo_config_file)
 
@@ -130,9 +121,6 @@ def test_process_item_exception(
     download_mock = mocker.patch('harmony_service.adapter.download')
     download_mock.side_effect = RuntimeError('Download went wrong')
 
-    stage_mock = mocker.patch('harmony_service.adapter.stage')
-    stage_mock.return_value = 's3://bucketname/staged-location'
-
     # Create and run the service
     harmony_config = config(validate=False)
 
@@ -142,3 +130,141 @@ def test_process_item_exception(
 
     with pytest.raises(RuntimeError):
         metadata_annotator.invoke()
+
+
+def test_process_item_multiple_items_prefetched(
+    sample_harmony_message,
+    adapter_temp_dir,
+    stage_mock,
+    mocker,
+):
+    """Confirm inputs for all items in a catalog are downloaded in the background."""
+    annotate_granule_mock = mocker.patch('harmony_service.adapter.annotate_granule')
+
+    def create_downloaded_file(href, destination_directory, **kwargs):
+        """Create an empty file to represent the downloaded input."""
+        downloaded_file_path = path_join(destination_directory, basename(href))
+        Path(downloaded_file_path).touch()
+        return downloaded_file_path
+
+    download_mock = mocker.patch('harmony_service.adapter.download')
+    download_mock.side_effect = create_downloaded_file
+
+    asset_hrefs = [
+        f'https://www.example.com/test_input_{index}.h5' for index in range(6)
+    ]
+    catalog = Catalog(id='input catalog', description='test input')
+
+    for index, asset_href in enumerate(asset_hrefs):
+        item = Item(
+            id=f'input granule {index}',
+            bbox=[-180, -90, 180, 90],
+            geometry=bbox_to_geometry([-180, -90, 180, 90]),
+            datetime=datetime(2000, 1, 2, 3, 4, 5),
+            properties={'props': 'None'},
+        )
+        item.add_asset('input data', Asset(asset_href, roles=['data']))
+        catalog.add_item(item)
+
+    metadata_annotator = MetadataAnnotatorAdapter(
+        sample_harmony_message, config=config(validate=False), catalog=catalog
+    )
+    _, output_stac = metadata_annotator.invoke()
+
+    assert len(list(output_stac.get_items(recursive=True))) == len(asset_hrefs)
+    assert annotate_granule_mock.call_count == len(asset_hrefs)
+
+    # Each input is downloaded only once:
+    assert sorted(call.args[0] for call in download_mock.call_args_list) == sorted(
+        asset_hrefs
+    )
+
+    # Prefetched inputs are removed once each item has been processed:
+    for asset_href in asset_hrefs:
+        assert not Path(path_join(adapter_temp_dir, basename(asset_href))).exists()
+
+
+def test_process_item_nested_catalog_prefetched(
+    sample_harmony_message, stage_mock, mocker
+):
+    """Confirm inputs are downloaded in processing order, with limited disk use.
+
+    Items in child catalogs are processed before those in the parent catalog.
+    An item without a data asset should only fail when it is processed, and
+    no more than `MAX_PREFETCHED_DOWNLOADS` inputs should be on disk at once.
+
+    """
+    mocker.patch.object(adapter, 'MAX_PREFETCHED_DOWNLOADS', 2)
+    downloaded_file_paths = []
+
+    def create_downloaded_file(href, destination_directory, **kwargs):
+        """Create an empty file to represent the downloaded input."""
+        downloaded_file_path = path_join(destination_directory, basename(href))
+        Path(downloaded_file_path).touch()
+        downloaded_file_paths.append(downloaded_file_path)
+        return downloaded_file_path
+
+    download_mock = mocker.patch('harmony_service.adapter.download')
+    download_mock.side_effect = create_downloaded_file
+
+    def check_inputs_on_disk(input_file_path, output_file_path, *args, **kwargs):
+        """Ensure the correct input is used, and few inputs are on disk."""
+        assert basename(input_file_path) == basename(output_file_path)
+        assert Path(input_file_path).exists()
+        assert sum(Path(path).exists() for path in downloaded_file_paths) <= 2
+
+    annotate_granule_mock = mocker.patch('harmony_service.adapter.annotate_granule')
+    annotate_granule_mock.side_effect = check_inputs_on_disk
+
+    def create_item(name, roles):
+        """Create a STAC item with a single asset, with the specified roles."""
+        item = Item(
+            id=name,
+            bbox=[-180, -90, 180, 90],
+            geometry=bbox_to_geometry([-180, -90, 180, 90]),
+            datetime=datetime(2000, 1, 2, 3, 4, 5),
+            properties={'props': 'None'},
+        )
+        item.add_asset('input', Asset(f'https://example.com/{name}.h5', roles=roles))
+        return item
+
+    catalog = Catalog(id='input catalog', description='test input')
+    child_catalog = Catalog(id='child catalog', description='test input')
+    catalog.add_child(child_catalog)
+
+    for name in ['child_0', 'child_1', 'child_2']:
+        child_catalog.add_item(create_item(name, ['data']))
+
+    catalog.add_item(create_item('parent_0', ['data']))
+    catalog.add_item(create_item('parent_1', ['metadata']))
+    catalog.add_item(create_item('parent_2', ['data']))
+
+    metadata_annotator = MetadataAnnotatorAdapter(
+        sample_harmony_message, config=config(validate=False), catalog=catalog
+    )
+    logger_exception_spy = mocker.spy(metadata_annotator.logger, 'exception')
+
+    with pytest.raises(StopIteration):
+        metadata_annotator.invoke()
+
+    # Items are processed until the item without a data asset is reached:
+    assert [
+        basename(call.args[1]) for call in annotate_granule_mock.call_args_list
+    ] == ['child_0.h5', 'child_1.h5', 'child_2.h5', 'parent_0.h5']
+    logger_exception_spy.assert_called_once()
+
+    # Each input is downloaded at most once, in the background, to the same
+    # directory. The input after the failed item may or may not have started
+    # downloading before the remaining downloads were cancelled:
+    downloaded_hrefs = [call.args[0] for call in download_mock.call_args_list]
+    assert len(downloaded_hrefs) == len(set(downloaded_hrefs))
+    assert set(downloaded_hrefs) - {'https://example.com/parent_2.h5'} == {
+        'https://example.com/child_0.h5',
+        'https://example.com/child_1.h5',
+        'https://example.com/child_2.h5',
+        'https://example.com/parent_0.h5',
+    }
+    assert len({call.args[1] for call in download_mock.call_args_list}) == 1
+
+    # The download directory is removed once processing ends:
+    assert not any(Path(path).exists() for path in downloaded_file_paths)
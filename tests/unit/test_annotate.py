@@ -1,9 +1,12 @@
 """Tests for metadata_annotator.annotate.py."""
 
+import os
 from os.path import join as path_join
+from os.path import samefile
 from os.path import split as path_split
 from unittest.mock import patch
 
+import h5py
 import numpy as np
 import pytest
 import xarray as xr
@@ -12,25 +15,39 @@ from varinfo import VarInfoFromNetCDF4
 
 from metadata_annotator.annotate import (
     annotate_granule,
+    compile_combined_override_pattern,
+    compile_override_pattern,
     construct_dim_path,
     copy_shared_dimensions_to_parent,
     create_new_variable,
     delete_variable,
     ensure_dimension_node_exists,
+    get_attribute_changes,
+    get_attributes_from_index,
+    get_data_variable_dimensions,
     get_dimension_variables,
     get_geotransform_config,
     get_grid_start_index,
+    get_group_index,
+    get_literal_prefix,
     get_matching_groups_and_variables,
     get_new_dimension_variables,
+    get_paths_matching_patterns,
+    get_paths_with_prefix,
     get_referenced_variables,
     get_spatial_dimension_type,
     get_spatial_dimension_variables,
     get_start_index_from_row_col_variable,
+    get_variable_from_index,
     get_variables_to_delete,
     has_dimension_override,
+    has_top_level_alternation,
+    is_attribute_only_update,
     is_exact_path,
     is_excluded_science_variable,
     is_temporary_attribute,
+    link_or_copy_file,
+    partition_override_patterns,
     update_dimension_names,
     update_dimension_variables,
     update_group_and_variable_attributes,
@@ -46,6 +63,7 @@ from metadata_annotator.exceptions import (
     MissingStartIndexConfiguration,
     MissingSubsetIndexReference,
 )
+from metadata_annotator.history_functions import PROGRAM, get_semantic_version
 
 
 def test_is_exact_path_is_exact():
@@ -63,6 +81,57 @@ def test_is_exact_path_alternates():
     assert not is_exact_path('/(path_one|path_two)/variable')
 
 
+def test_is_exact_path_hyphenated():
+    """Returns True when the path contains characters only escaped for safety."""
+    assert is_exact_path('/Land-Model-Constants_Data/variable one')
+
+
+@pytest.mark.parametrize(
+    'pattern_string, expected_prefix',
+    [
+        ('/group/variable', '/group/variable'),
+        ('/group/.*', '/group/'),
+        ('/(group_one|group_two)/variable', '/'),
+        ('/group/variables?', '/group/variable'),
+        ('/group/variables*', '/group/variable'),
+        ('/group/variables{2}', '/group/variable'),
+        ('/group/variables+', '/group/variables'),
+        ('.*variable', ''),
+        ('/group_one/.*|/group_two/.*', ''),
+    ],
+)
+def test_get_literal_prefix(pattern_string, expected_prefix):
+    """Ensure the literal prefix required by all matches is found."""
+    assert get_literal_prefix(pattern_string) == expected_prefix
+
+
+@pytest.mark.parametrize(
+    'pattern_string, expected_result',
+    [
+        ('/group_one/.*|/group_two/.*', True),
+        ('/(group_one|group_two)/.*', False),
+        ('/group/[|]', False),
+        (r'/group/\|', False),
+        ('/group/.*', False),
+    ],
+)
+def test_has_top_level_alternation(pattern_string, expected_result):
+    """Ensure only alternation outside of groups and character sets is found."""
+    assert has_top_level_alternation(pattern_string) == expected_result
+
+
+def test_compile_override_pattern():
+    """Ensure a pattern is compiled once and then retrieved from the cache."""
+    compile_override_pattern.cache_clear()
+
+    first_pattern = compile_override_pattern('/path/.*')
+    second_pattern = compile_override_pattern('/path/.*')
+
+    assert first_pattern is second_pattern
+    assert first_pattern.match('/path/variable') is not None
+    assert compile_override_pattern.cache_info().hits == 1
+
+
 def test_update_metadata_attributes_variable(sample_netcdf4_file, sample_varinfo):
     """Check that attributes are added and updated."""
     with xr.open_datatree(sample_netcdf4_file, decode_times=False) as test_datatree:
@@ -70,9 +139,11 @@ def test_update_metadata_attributes_variable(sample_netcdf4_file, sample_varinfo
         update_metadata_attributes(test_datatree, '/variable_one', sample_varinfo)
 
         # Check outputs from the function:
-        assert set(test_datatree['/variable_one'].attrs.keys()) == set(
-            ['coordinates', 'grid_mapping', 'units']
-        )
+        assert set(test_datatree['/variable_one'].attrs.keys()) == {
+            'coordinates',
+            'grid_mapping',
+            'units',
+        }
 
         # The units had no overrides, so should be unchanged.
         assert (
@@ -115,9 +186,9 @@ def test_update_metadata_attributes_deletion(sample_netcdf4_file, sample_varinfo
 
         # Check outputs from the function:
         # Only coordinates should remain as "delete" should have been removed
-        assert set(test_datatree['/sub_group/variable_two'].attrs.keys()) == set(
-            ['coordinates']
-        )
+        assert set(test_datatree['/sub_group/variable_two'].attrs.keys()) == {
+            'coordinates'
+        }
 
         # coordinates had no overrides, so should be unchanged
         assert (
@@ -140,9 +211,9 @@ def test_update_metadata_attributes_ignore_temporary_variables(
 
         # Check outputs from the function:
         # Only coordinates should remain as "_*temp" should be ignored
-        assert set(test_datatree['/sub_group/variable_four'].attrs.keys()) == set(
-            ['coordinates']
-        )
+        assert set(test_datatree['/sub_group/variable_four'].attrs.keys()) == {
+            'coordinates'
+        }
 
         # The coordinates was updated, so should be the value in the configuration file
         assert (
@@ -176,23 +247,117 @@ def test_get_matching_groups_and_variables(sample_varinfo):
     # Each of the following matches a rule from the configuration file, trying
     # to check: the root group, a sub group, a variable in the root group and
     # a nested variable.
-    assert matching_items == set(
-        [
-            '/',
-            '/sub_group',
-            '/variable_one',
-            '/sub_group/variable_two',
-            '/sub_group/variable_four',
-        ]
-    )
+    assert matching_items == {
+        '/',
+        '/sub_group',
+        '/variable_one',
+        '/sub_group/variable_two',
+        '/sub_group/variable_four',
+    }
 
     # The /EASE2_north_polar_projection_36km variable is specifically included in the
     # configuration file to test missing variable behaviour.
-    assert missing_variables == set(
-        [
-            '/EASE2_north_polar_projection_36km',
-        ]
+    assert missing_variables == {
+        '/EASE2_north_polar_projection_36km',
+    }
+
+
+def test_get_matching_groups_and_variables_hyphenated_path(mocker):
+    """Ensure paths with characters escaped only for safety are exact paths.
+
+    Such paths are matched as a prefix of group and variable paths, as with
+    `re.match`, and are reported as missing when they match nothing.
+
+    """
+    granule_varinfo = mocker.Mock(
+        groups={'/', '/group'},
+        variables={'/group/var-10', '/group/var 2'},
+    )
+    granule_varinfo.cf_config.metadata_overrides = {
+        '/group/var-1': {},
+        '/group/var 2': {},
+        '/group/var-3': {},
+    }
+
+    assert get_matching_groups_and_variables(granule_varinfo) == (
+        {'/group/var-10', '/group/var 2'},
+        {'/group/var-3'},
+    )
+
+
+def test_get_matching_groups_and_variables_no_overrides(
+    sample_netcdf4_file, varinfo_config_file
+):
+    """Ensure no matches or missing variables are found without overrides."""
+    varinfo = VarInfoFromNetCDF4(
+        sample_netcdf4_file,
+        config_file=varinfo_config_file,
+        short_name='OTHER_SHORT_NAME',
     )
+    assert get_matching_groups_and_variables(varinfo) == (set(), set())
+
+
+def test_partition_override_patterns():
+    """Ensure exact paths are separated from regular expression patterns."""
+    assert partition_override_patterns(
+        ('/x', '/group/.*', '/group/variable', '/(one|two)/y$')
+    ) == (('/x', '/group/variable'), ('/group/.*', '/(one|two)/y$'))
+
+
+@pytest.mark.parametrize(
+    'pattern_strings, expected_paths',
+    [
+        (('/group/.*', '/x$'), {'/group/aa', '/group/ab', '/x'}),
+        (('(?i)/GROUP/.*',), {'/group/aa', '/group/ab'}),
+        (('/(?P<name>group)/aa', '/(?P<name>other)/.*'), {'/group/aa'}),
+        ((r'/group/(a)\1',), {'/group/aa'}),
+        ((r'/x$', r'/group/(?P<letter>a)(?P=letter)'), {'/group/aa', '/x'}),
+    ],
+)
+def test_get_paths_matching_patterns(pattern_strings, expected_paths):
+    """Ensure paths matching any pattern are found.
+
+    Patterns with groups or global inline flags cannot be combined into a
+    single alternation, so are matched separately.
+
+    """
+    paths = {'/', '/group', '/group/aa', '/group/ab', '/x', '/xy'}
+    assert get_paths_matching_patterns(paths, pattern_strings) == expected_paths
+
+
+@pytest.mark.parametrize(
+    'pattern_strings, can_combine',
+    [
+        (('/group/.*', '/(?:one|two)/y$', '/group/(?i:variable)'), True),
+        (('/group/.*', '(?i)/group/.*'), False),
+        (('/(?P<name>group)/.*', '/(?P<name>other)/.*'), False),
+        ((r'/group/(a)\1',), False),
+    ],
+)
+def test_compile_combined_override_pattern(pattern_strings, can_combine):
+    """Ensure patterns are only combined when that does not change matches."""
+    combined_pattern = compile_combined_override_pattern(pattern_strings)
+    assert (combined_pattern is not None) == can_combine
+
+
+@pytest.mark.parametrize(
+    'prefix, expected_paths',
+    [
+        ('/group/variable', ['/group/variable', '/group/variable_two']),
+        ('/group/variable_two', ['/group/variable_two']),
+        ('/x', ['/x']),
+        ('/a', []),
+        ('/z', []),
+    ],
+)
+def test_get_paths_with_prefix(prefix, expected_paths):
+    """Ensure only, and all, paths beginning with the prefix are returned.
+
+    This mirrors the `re.match` semantics for an exact path pattern.
+
+    """
+    sorted_paths = ['/', '/group', '/group/variable', '/group/variable_two', '/x']
+    assert get_paths_with_prefix(sorted_paths, prefix) == expected_paths
 
 
 @freeze_time('2000-01-02T03:04:05+00:00')
@@ -201,7 +366,6 @@ def test_annotate_granule(
     expected_output_netcdf4_file,
     temp_output_file_path,
     varinfo_config_file,
-    temp_dir,
     mocker,
 ):
     """Confirm that a granule has all metadata updated as expected.
@@ -224,9 +388,7 @@ def test_annotate_granule(
     get_request_url_attribute_mock = mocker.patch(
         'metadata_annotator.history_functions.get_request_url_attribute'
     )
-    get_request_url_attribute_mock.return_value = path_join(
-        temp_dir, 'expected_output.nc'
-    )
+    get_request_url_attribute_mock.return_value = expected_output_netcdf4_file
 
     annotate_granule(
         sample_netcdf4_file, temp_output_file_path, varinfo_config_file, 'TEST01'
@@ -245,13 +407,16 @@ def test_annotate_granule_no_changes(
     sample_netcdf4_file,
     temp_output_file_path,
     varinfo_config_file,
+    mocker,
 ):
     """Confirm that a granule is unchanged if there are no overrides for it.
 
     The collection short name is set to something that will not match any of
-    the configuration file overrides.
+    the configuration file overrides, so the granule should not be parsed.
 
     """
+    varinfo_mock = mocker.patch('metadata_annotator.annotate.CachedVarInfoFromNetCDF4')
+
     annotate_granule(
         sample_netcdf4_file,
         temp_output_file_path,
@@ -259,6 +424,8 @@ def test_annotate_granule_no_changes(
         'OTHER_SHORT_NAME',
     )
 
+    varinfo_mock.assert_not_called()
+
     with (
         xr.open_datatree(sample_netcdf4_file, decode_times=False) as expected_datatree,
         xr.open_datatree(temp_output_file_path, decode_times=False) as results_datatree,
@@ -266,6 +433,202 @@ def test_annotate_granule_no_changes(
         assert results_datatree.identical(expected_datatree)
 
 
+def test_link_or_copy_file_hard_link(sample_netcdf4_file, temp_output_file_path):
+    """Ensure a hard link is created when possible."""
+    link_or_copy_file(sample_netcdf4_file, temp_output_file_path)
+    assert samefile(sample_netcdf4_file, temp_output_file_path)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, 'copy_file_range'), reason='os.copy_file_range not available'
+)
+def test_link_or_copy_file_copy_file_range(
+    sample_netcdf4_file, temp_output_file_path, mocker
+):
+    """Ensure the file is copied when a hard link cannot be created."""
+    mocker.patch('metadata_annotator.annotate.os.link', side_effect=OSError)
+    shutil_copy_mock = mocker.patch('metadata_annotator.annotate.copy')
+
+    link_or_copy_file(sample_netcdf4_file, temp_output_file_path)
+
+    assert not samefile(sample_netcdf4_file, temp_output_file_path)
+    shutil_copy_mock.assert_not_called()
+    with (
+        open(sample_netcdf4_file, 'rb') as expected_file,
+        open(temp_output_file_path, 'rb') as results_file,
+    ):
+        assert results_file.read() == expected_file.read()
+
+
+def test_link_or_copy_file_fallback_copy(
+    sample_netcdf4_file, temp_output_file_path, mocker
+):
+    """Ensure a standard copy is made when no faster option is supported."""
+    mocker.patch('metadata_annotator.annotate.os.link', side_effect=OSError)
+    mocker.patch(
+        'metadata_annotator.annotate.os.copy_file_range',
+        side_effect=OSError,
+        create=True,
+    )
+
+    link_or_copy_file(sample_netcdf4_file, temp_output_file_path)
+
+    assert not samefile(sample_netcdf4_file, temp_output_file_path)
+    with (
+        open(sample_netcdf4_file, 'rb') as expected_file,
+        open(temp_output_file_path, 'rb') as results_file,
+    ):
+        assert results_file.read() == expected_file.read()
+
+
+@freeze_time('2000-01-02T03:04:05+00:00')
+def test_annotate_granule_attribute_only(
+    sample_netcdf4_file, temp_output_file_path, varinfo_config_file, temp_dir, mocker
+):
+    """Confirm attribute only changes are made without rewriting the file.
+
+    The output should be the same as when the whole file is rewritten.
+
+    """
+    open_datatree_spy = mocker.spy(xr, 'open_datatree')
+    annotate_granule(
+        sample_netcdf4_file, temp_output_file_path, varinfo_config_file, 'TEST08'
+    )
+    open_datatree_spy.assert_not_called()
+
+    # Produce the same output by rewriting the whole file:
+    rewritten_output_path = path_join(temp_dir, 'rewritten_output.nc')
+    mocker.patch(
+        'metadata_annotator.annotate.is_attribute_only_update', return_value=False
+    )
+    annotate_granule(
+        sample_netcdf4_file, rewritten_output_path, varinfo_config_file, 'TEST08'
+    )
+
+    with (
+        xr.open_datatree(
+            temp_output_file_path, decode_times=False, decode_coords=False
+        ) as results_datatree,
+        xr.open_datatree(
+            rewritten_output_path, decode_times=False, decode_coords=False
+        ) as expected_datatree,
+    ):
+        assert results_datatree.identical(expected_datatree)
+
+        assert results_datatree.attrs['update'] == 'corrected root group value'
+        assert 'delete' not in results_datatree.attrs
+        assert results_datatree.attrs['history'] == (
+            f'2000-01-02T03:04:05+00:00 {PROGRAM} {get_semantic_version()}'
+        )
+        assert results_datatree['/sub_group/variable_two'].attrs == {
+            'coordinates': 'time latitude longitude',
+            'valid_min': 0.0,
+        }
+        assert results_datatree['/sub_group/variable_four'].attrs == {
+            'coordinates': 'time latitude longitude',
+            'valid_min': 0.0,
+        }
+
+    # The input file should not have been changed:
+    with xr.open_datatree(sample_netcdf4_file, decode_times=False) as input_datatree:
+        assert input_datatree.attrs['update'] == 'original value'
+
+    # String attributes should be variable-length, as when rewriting the file:
+    with h5py.File(temp_output_file_path, 'r') as results_file:
+        for attribute_name in ['update', 'history']:
+            attribute_type = results_file.attrs.get_id(attribute_name).dtype
+            assert h5py.check_string_dtype(attribute_type).length is None
+
+
+@freeze_time('2000-01-02T03:04:05+00:00')
+def test_annotate_granule_attribute_only_hdf5(
+    temp_dir, temp_output_file_path, varinfo_config_file
+):
+    """Confirm an HDF5 file that `netCDF4` cannot write to is rewritten."""
+    input_file_path = path_join(temp_dir, 'plain_hdf5_input.h5')
+
+    with h5py.File(input_file_path, 'w') as input_file:
+        input_file.attrs['short_name'] = 'TEST08'
+        input_file.attrs['update'] = 'original value'
+        input_file.attrs['delete'] = 'to be deleted'
+        sub_group = input_file.create_group('sub_group')
+
+        for variable_name in ['variable_two', 'variable_four']:
+            variable = sub_group.create_dataset(variable_name, data=np.arange(3.0))
+            variable.attrs['delete'] = 'to be deleted'
+
+    with pytest.warns(UserWarning, match='phony_dims'):
+        annotate_granule(
+            input_file_path, temp_output_file_path, varinfo_config_file, 'TEST08'
+        )
+
+    with xr.open_datatree(
+        temp_output_file_path, decode_times=False, decode_coords=False
+    ) as results_datatree:
+        assert results_datatree.attrs['update'] == 'corrected root group value'
+        assert 'delete' not in results_datatree.attrs
+        assert results_datatree.attrs['history'] == (
+            f'2000-01-02T03:04:05+00:00 {PROGRAM} {get_semantic_version()}'
+        )
+        assert results_datatree['/sub_group/variable_two'].attrs == {
+            'coordinates': 'time latitude longitude',
+            'valid_min': 0.0,
+        }
+        np.testing.assert_array_equal(
+            results_datatree['/sub_group/variable_four'].values, np.arange(3.0)
+        )
+
+
+@pytest.mark.parametrize(
+    'variables_to_create, variables_to_delete, item_to_update, expected',
+    [
+        (set(), [], '/sub_group/variable_two', True),
+        ({'/EASE2_north_polar_projection_36km'}, [], '/variable_three', False),
+        (set(), ['/variable_three'], '/sub_group/variable_two', False),
+    ],
+)
+def test_is_attribute_only_update(
+    sample_netcdf4_file,
+    varinfo_config_file,
+    variables_to_create,
+    variables_to_delete,
+    item_to_update,
+    expected,
+):
+    """Ensure only attribute changes to existing items are identified."""
+    varinfo = VarInfoFromNetCDF4(
+        sample_netcdf4_file, config_file=varinfo_config_file, short_name='TEST08'
+    )
+    assert (
+        is_attribute_only_update(
+            {item_to_update}, variables_to_create, variables_to_delete, varinfo
+        )
+        is expected
+    )
+
+
+def test_is_attribute_only_update_fill_value(sample_varinfo, mocker):
+    """Ensure a _FillValue override requires the file to be rewritten."""
+    mocker.patch.object(
+        sample_varinfo.cf_config,
+        'get_metadata_overrides',
+        return_value={'_FillValue': -1.0},
+    )
+    assert not is_attribute_only_update({'/variable_one'}, set(), [], sample_varinfo)
+
+
+def test_get_attribute_changes(sample_varinfo):
+    """Ensure updates and deletions are identified, ignoring temporary attributes."""
+    assert get_attribute_changes('/sub_group/variable_two', sample_varinfo) == (
+        {},
+        {'delete', 'delete_two'},
+    )
+    assert get_attribute_changes('/sub_group/variable_four', sample_varinfo) == (
+        {'coordinates': 'time latitude longitude'},
+        set(),
+    )
+
+
 def test_annotate_granule_variable_exclusions_only(
     sample_netcdf4_file_test05,
     expected_output_netcdf4_file_test05,
@@ -311,110 +674,129 @@ def test_annotate_granule_with_dimension_variable_updates(temp_output_file_path)
         assert (
             set(datatree['/Freeze_Thaw_Retrieval_Data_Global'].dataset['y'].attrs)
             == set(datatree['/Freeze_Thaw_Retrieval_Data_Global'].dataset['x'].attrs)
-            == set(
-                [
-                    'axis',
-                    'dimensions',
-                    'grid_mapping',
-                    'long_name',
-                    'standard_name',
-                    'type',
-                    'units',
-                ]
-            )
+            == {
+                'axis',
+                'dimensions',
+                'grid_mapping',
+                'long_name',
+                'standard_name',
+                'type',
+                'units',
+            }
         )
 
 
-def test_update_group_and_variable_attributes() -> None:
+def test_update_group_and_variable_attributes(
+    spl3ftp_datatree, spl3ftp_varinfo
+) -> None:
     """Confirm the attributes are updated for existing variables.
 
     This is based on configuration including pseudo dimension variables.
 
     """
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
-        items_to_update = [
-            '/Freeze_Thaw_Retrieval_Data_Global/surface_flag',
-        ]
-
-        granule_varinfo = VarInfoFromNetCDF4(
-            'tests/data/SC_SPL3FTP_spatially_subsetted.nc4',
-            short_name='SPL3FTP',
-            config_file='metadata_annotator/earthdata_varinfo_config.json',
-        )
-        update_group_and_variable_attributes(datatree, items_to_update, granule_varinfo)
+    datatree = spl3ftp_datatree
+    items_to_update = [
+        '/Freeze_Thaw_Retrieval_Data_Global/surface_flag',
+    ]
 
-        # Check attributes expected are added.
-        assert all(
-            item
-            in datatree['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'].attrs.keys()
-            for item in ['grid_mapping', 'dimensions']
-        )
+    update_group_and_variable_attributes(datatree, items_to_update, spl3ftp_varinfo)
+
+    # Check attributes expected are added.
+    assert all(
+        item in datatree['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'].attrs.keys()
+        for item in ['grid_mapping', 'dimensions']
+    )
 
 
-def test_update_dimension_names() -> None:
+def test_update_dimension_names(spl3ftp_datatree) -> None:
     """Verify that the dimension names are renamed as expected."""
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
-        variable_to_update = '/Freeze_Thaw_Retrieval_Data_Global/transition_direction'
-        datatree[variable_to_update] = datatree[variable_to_update].assign_attrs(
-            dimensions='y x'
-        )
+    datatree = spl3ftp_datatree
+    variable_to_update = '/Freeze_Thaw_Retrieval_Data_Global/transition_direction'
+    datatree[variable_to_update].attrs['dimensions'] = 'y x'
+    update_dimension_names(datatree, variable_to_update)
+
+    # Check dimension renames are as expected.
+    assert set(
+        datatree['/Freeze_Thaw_Retrieval_Data_Global/transition_direction'].dims
+    ) == {'y', 'x'}
+    assert datatree[variable_to_update].attrs['dimensions'] == 'y x'
+
+    # Check the variable is not replaced if the names already match
+    renamed_variable = datatree[variable_to_update].variable
+    update_dimension_names(datatree, variable_to_update)
+    assert datatree[variable_to_update].variable is renamed_variable
+
+    # Check for incorrect dimensions list
+    datatree[variable_to_update].attrs['dimensions'] = 'am_pm y x'
+    with pytest.raises(InvalidDimensionsConfiguration):
         update_dimension_names(datatree, variable_to_update)
 
-        # Check dimension renames are as expected.
-        assert set(
-            datatree['/Freeze_Thaw_Retrieval_Data_Global/transition_direction'].dims
-        ) == set(['y', 'x'])
 
-        # Check for incorrect dimensions list
-        datatree[variable_to_update] = datatree[variable_to_update].assign_attrs(
-            dimensions='am_pm y x'
-        )
-        with pytest.raises(InvalidDimensionsConfiguration):
-            update_dimension_names(datatree, variable_to_update)
+def test_create_new_variable(spl3ftp_datatree, spl3ftp_varinfo) -> None:
+    """Test if a new variable is successfully created."""
+    datatree = spl3ftp_datatree
+    variable_to_create = '/EASE2_global_projection_36km'
+
+    create_new_variable(datatree, variable_to_create, spl3ftp_varinfo)
+
+    # Check if the new variable is created.
+    assert 'EASE2_global_projection_36km' in datatree['/'].data_vars
+
+    # Check if attributes are updated for the variable.
+    assert set(datatree['/EASE2_global_projection_36km'].attrs.keys()) == {
+        'false_easting',
+        'false_northing',
+        'grid_mapping_name',
+        'longitude_of_central_meridian',
+        'standard_parallel',
+        'inverse_flattening',
+        'semi_minor_axis',
+        'semi_major_axis',
+        'horizontal_datum_name',
+    }
 
 
-def test_create_new_variable() -> None:
-    """Test if a new variable is successfully created."""
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
-        variable_to_create = '/EASE2_global_projection_36km'
+def test_get_dimension_variables(spl3ftp_datatree) -> set[str]:
+    """Ensure return of dimension variables."""
+    datatree = spl3ftp_datatree
+    dimension_variables = get_dimension_variables(datatree)
+    assert dimension_variables == {
+        '/Freeze_Thaw_Retrieval_Data_Global/dim0',
+        '/Freeze_Thaw_Retrieval_Data_Global/dim1',
+        '/Freeze_Thaw_Retrieval_Data_Global/dim2',
+    }
 
-        granule_varinfo = VarInfoFromNetCDF4(
-            'tests/data/SC_SPL3FTP_spatially_subsetted.nc4',
-            short_name='SPL3FTP',
-            config_file='metadata_annotator/earthdata_varinfo_config.json',
-        )
-        create_new_variable(datatree, variable_to_create, granule_varinfo)
-
-        # Check if the new variable is created.
-        assert 'EASE2_global_projection_36km' in datatree['/'].data_vars
-
-        # Check if attributes are updated for the variable.
-        assert set(datatree['/EASE2_global_projection_36km'].attrs.keys()) == set(
-            [
-                'false_easting',
-                'false_northing',
-                'grid_mapping_name',
-                'longitude_of_central_meridian',
-                'standard_parallel',
-                'inverse_flattening',
-                'semi_minor_axis',
-                'semi_major_axis',
-                'horizontal_datum_name',
-            ]
-        )
+
+def test_get_dimension_variables_root_group(sample_netcdf4_file_test07):
+    """Ensure root group dimensions have a single leading slash."""
+    with xr.open_datatree(sample_netcdf4_file_test07) as datatree:
+        assert get_dimension_variables(datatree) == {
+            '/x_root',
+            '/y_root',
+            '/sub_group/x',
+            '/sub_group/y',
+        }
 
 
-def test_get_dimension_variables() -> set[str]:
-    """Ensure return of dimension variables."""
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
-        dimension_variables = get_dimension_variables(datatree)
-        assert dimension_variables == set(
-            [
-                '/Freeze_Thaw_Retrieval_Data_Global/dim0',
-                '/Freeze_Thaw_Retrieval_Data_Global/dim1',
-                '/Freeze_Thaw_Retrieval_Data_Global/dim2',
-            ]
-        )
+def test_get_data_variable_dimensions():
+    """Ensure only dimensions of data variables in the node are returned.
+
+    Dimensions only used by coordinates, including those inherited from a
+    parent group, should be excluded.
+
+    """
+    datatree = xr.DataTree.from_dict(
+        {
+            '/': xr.Dataset(
+                {'science': (('y', 'x'), np.zeros((2, 3)))},
+                coords={'x': [1, 2, 3], 'time': ('time_dim', [0])},
+            ),
+            '/sub_group': xr.Dataset({'nested': (('y', 'z'), np.zeros((2, 4)))}),
+        }
+    )
+
+    assert get_data_variable_dimensions(datatree) == {'x', 'y'}
+    assert get_data_variable_dimensions(datatree['/sub_group']) == {'y', 'z'}
 
 
 def test_update_spatial_dimension_values(
@@ -464,6 +846,45 @@ def test_get_spatial_dimension_variables_no_matches(sample_netcdf4_file_test02)
         assert get_spatial_dimension_variables(test_datatree, variables) == set()
 
 
+def test_get_group_index(sample_netcdf4_file_test07) -> None:
+    """Ensure all groups are indexed by their full path."""
+    with xr.open_datatree(sample_netcdf4_file_test07) as test_datatree:
+        group_index = get_group_index(test_datatree)
+        assert group_index.keys() == {'/', '/sub_group'}
+        assert group_index['/sub_group'] is test_datatree['/sub_group']
+
+
+@pytest.mark.parametrize(
+    'variable_path', ['/variable_one', '/sub_group/variable_three']
+)
+def test_get_variable_from_index(sample_netcdf4_file_test07, variable_path) -> None:
+    """Ensure variables in the root group and nested groups are retrieved."""
+    with xr.open_datatree(sample_netcdf4_file_test07) as test_datatree:
+        variable = get_variable_from_index(
+            get_group_index(test_datatree), variable_path
+        )
+        assert variable.identical(test_datatree[variable_path].variable)
+
+
+@pytest.mark.parametrize(
+    'group_or_variable_path', ['/', '/sub_group', '/sub_group/variable_three']
+)
+def test_get_attributes_from_index(
+    sample_netcdf4_file_test07, group_or_variable_path
+) -> None:
+    """Ensure the retrieved attributes are those of the group or variable."""
+    with xr.open_datatree(sample_netcdf4_file_test07) as test_datatree:
+        attributes = get_attributes_from_index(
+            get_group_index(test_datatree), group_or_variable_path
+        )
+        attributes['new_attribute'] = 'new value'
+
+        # The attributes should be updated in place in the DataTree:
+        assert (
+            test_datatree[group_or_variable_path].attrs['new_attribute'] == 'new value'
+        )
+
+
 def test_get_grid_start_index_uses_subset_index_reference(
     sample_netcdf4_file_test02, sample_varinfo_test02
 ) -> None:
@@ -520,6 +941,9 @@ def test_get_start_index_from_row_col_variable(sample_netcdf4_file_test02) -> No
             == 5
         )
 
+        # Only the first element should have been read, not the whole array:
+        assert not test_datatree['EASE_column_index'].variable._in_memory
+
 
 def test_get_start_index_from_row_col_variable_missing_reference(
     sample_netcdf4_file_test02,
@@ -719,18 +1143,22 @@ def test_update_dimension_variables(
 
 def test_get_variables_to_delete(sample_varinfo_test05):
     """Ensure correct list of variables to delete is obtained."""
-    expected_result = set(
-        [
-            '/string_time_utc_seconds',
-            '/sub_group/string_time_utc_seconds',
-            '/sub_group/nested_group/string_time_utc_seconds',
-        ]
-    )
+    expected_result = {
+        '/string_time_utc_seconds',
+        '/sub_group/string_time_utc_seconds',
+        '/sub_group/nested_group/string_time_utc_seconds',
+    }
     assert set(get_variables_to_delete(sample_varinfo_test05)) == expected_result
 
 
 def test_is_excluded_science_variable(sample_varinfo_test05):
-    """Ensure excluded science variables are determined correctly."""
+    """Ensure excluded science variables are determined correctly.
+
+    The exclusions pattern should only be compiled for the first variable.
+
+    """
+    compile_override_pattern.cache_clear()
+
     assert is_excluded_science_variable(
         sample_varinfo_test05, '/string_time_utc_seconds'
     )
@@ -749,6 +1177,7 @@ def test_is_excluded_science_variable(sample_varinfo_test05):
     assert not is_excluded_science_variable(
         sample_varinfo_test05, '/sub_group/nested/string_time_seconds'
     )
+    assert compile_override_pattern.cache_info().misses == 1
 
 
 @pytest.mark.parametrize(
@@ -866,7 +1295,7 @@ def test_copy_shared_dimensions_to_parent(temp_dir):
     )
     sample_datatree.to_netcdf(file_name, encoding=None)
     with xr.open_datatree(file_name) as test_datatree:
-        variables_to_create = set(['/x', '/y'])
+        variables_to_create = {'/x', '/y'}
         # This inital check confirms the dimension variables are not present in the
         # configured parent group before being processed.
         for variable in variables_to_create:
@@ -53,6 +53,37 @@ def test_compute_dimension_scale_y():
     assert np.allclose(result, expected_result)
 
 
+def test_compute_dimension_scale_start_index_and_dtype():
+    """Tests the dimension scale is offset by the start index and cast."""
+    geotransform_config = [-9000000, 36000, 0, 9000000, 0, -36000]
+    result = compute_dimension_scale(2, 3, 'x', 'float32', geotransform_config)
+
+    expected_result = np.array(
+        [
+            geotransform_from_config(geotransform_config).col_row_to_xy(column, 0)[0]
+            for column in range(2, 5)
+        ],
+        dtype=np.float32,
+    )
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, expected_result)
+
+
+def test_compute_dimension_scale_cached():
+    """Tests the same read-only dimension scale is returned for the same grid."""
+    geotransform_config = [-9000000, 36000, 0, 9000000, 0, -36000]
+    result = compute_dimension_scale(0, 3, 'y', 'float64', geotransform_config)
+
+    assert not result.flags.writeable
+    assert (
+        compute_dimension_scale(0, 3, 'y', 'float64', list(geotransform_config))
+        is result
+    )
+    assert (
+        compute_dimension_scale(1, 3, 'y', 'float64', geotransform_config) is not result
+    )
+
+
 def test_compute_dimension_scale_raises_invalid_spatial_dimension_type():
     """Tests dimension scale is computed correctly."""
     with pytest.raises(InvalidSpatialDimensionType):
@@ -5,13 +5,13 @@ import json
 import pytest
 import xarray as xr
 from freezegun import freeze_time
-from varinfo import VarInfoFromNetCDF4
 
 from metadata_annotator.exceptions import MissingDimensionVariable
 from metadata_annotator.history_functions import (
     PROGRAM,
     get_dim_index_from_var_dim_map,
     get_dimension_index_map,
+    get_first_query_value,
     get_index_range_substring,
     get_request_url_attribute,
     get_semantic_version,
@@ -109,19 +109,21 @@ def test_get_index_range_substring() -> None:
     assert index_ranges == []
 
 
-def test_parse_start_indices_from_history_attr(sample_netcdf4_file) -> None:
+def test_parse_start_indices_from_history_attr(
+    sample_netcdf4_file, spl3ftp_datatree
+) -> None:
     """Ensure that the index range from history attribute are retrieved correctly."""
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
-        idxdict = parse_start_indices_from_history_attr(datatree)
-        assert idxdict['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'] == [
-            0,
-            16,
-            227,
-        ]
-        assert idxdict['/Freeze_Thaw_Retrieval_Data_Global/transition_direction'] == [
-            16,
-            227,
-        ]
+    datatree = spl3ftp_datatree
+    idxdict = parse_start_indices_from_history_attr(datatree)
+    assert idxdict['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'] == [
+        0,
+        16,
+        227,
+    ]
+    assert idxdict['/Freeze_Thaw_Retrieval_Data_Global/transition_direction'] == [
+        16,
+        227,
+    ]
 
     with xr.open_datatree(sample_netcdf4_file, decode_times=False) as test_datatree:
         idxdict = parse_start_indices_from_history_attr(test_datatree)
@@ -132,13 +134,25 @@ def test_parse_start_indices_from_history_attr(sample_netcdf4_file) -> None:
         assert not idxdict
 
 
-def test_get_variable_dimension_map() -> None:
+@pytest.mark.parametrize(
+    'query_string, expected_value',
+    [
+        ('https://example.com/granule.nc4?key=value&other=ignored', 'value'),
+        ('https://example.com/granule.nc4?empty=&key=value+one', 'value one'),
+        (
+            'https://example.com/granule.nc4?uuid=1,dap4.ce=/variable',
+            '1,dap4.ce=/variable',
+        ),
+        ('This is a history attribute to test', ''),
+    ],
+)
+def test_get_first_query_value(query_string, expected_value) -> None:
+    """Ensure the first non-empty query value is returned, as for parse_qs."""
+    assert get_first_query_value(query_string) == expected_value
+
+
+def test_get_variable_dimension_map(spl3ftp_datatree, spl3ftp_varinfo) -> None:
     """Ensure that the correct dimensions list is returned for requested variables."""
-    granule_varinfo = VarInfoFromNetCDF4(
-        'tests/data/SC_SPL3FTP_spatially_subsetted.nc4',
-        short_name='SPL3FTP',
-        config_file='metadata_annotator/earthdata_varinfo_config.json',
-    )
     dimension_variables = {
         '/Freeze_Thaw_Retrieval_Data_Global/am_pm',
         '/Freeze_Thaw_Retrieval_Data_Global/y',
@@ -157,80 +171,80 @@ def test_get_variable_dimension_map() -> None:
         '/Freeze_Thaw_Retrieval_Data_Global/longitude',
         '/Freeze_Thaw_Retrieval_Data_Global/surface_flag',
     }
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as dtree:
-        variable_dimensions_dict = get_variable_dimension_map(
-            granule_varinfo, dtree, dimension_variables
-        )
+    dtree = spl3ftp_datatree
+    variable_dimensions_dict = get_variable_dimension_map(
+        spl3ftp_varinfo, dtree, dimension_variables
+    )
 
     assert variable_dimensions_dict[expected_dimensions] in expected_variables
 
 
-def test_get_dimension_index_map() -> None:
+def test_get_dimension_index_map(spl3ftp_datatree, spl3ftp_varinfo) -> None:
     """Ensure that the dimensions are returned with the correct subset indices."""
-    with xr.open_datatree('tests/data/SC_SPL3FTP_spatially_subsetted.nc4') as datatree:
-        granule_varinfo = VarInfoFromNetCDF4(
-            'tests/data/SC_SPL3FTP_spatially_subsetted.nc4',
-            short_name='SPL3FTP',
-            config_file='metadata_annotator/earthdata_varinfo_config.json',
-        )
-        # Setup the test to make sure it has the updated configuration
-        data_set = xr.Dataset(datatree['/Freeze_Thaw_Retrieval_Data_Global'])
-        renamed_da = datatree['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'].rename(
-            {'dim0': 'am_pm', 'dim1': 'y', 'dim2': 'x'}
-        )
-        datatree['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'] = renamed_da
+    datatree = spl3ftp_datatree
+    # Setup the test to make sure it has the updated configuration
+    data_set = xr.Dataset(datatree['/Freeze_Thaw_Retrieval_Data_Global'])
+    renamed_da = datatree['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'].rename(
+        {'dim0': 'am_pm', 'dim1': 'y', 'dim2': 'x'}
+    )
+    datatree['/Freeze_Thaw_Retrieval_Data_Global/surface_flag'] = renamed_da
 
-        renamed_da = datatree[
-            '/Freeze_Thaw_Retrieval_Data_Global/transition_direction'
-        ].rename({'dim1': 'y', 'dim2': 'x'})
-        datatree['/Freeze_Thaw_Retrieval_Data_Global/transition_direction'] = renamed_da
+    renamed_da = datatree[
+        '/Freeze_Thaw_Retrieval_Data_Global/transition_direction'
+    ].rename({'dim1': 'y', 'dim2': 'x'})
+    datatree['/Freeze_Thaw_Retrieval_Data_Global/transition_direction'] = renamed_da
 
-        data_set = xr.Dataset(datatree['/Freeze_Thaw_Retrieval_Data_Global'])
-        data_array = data_set['am_pm']
-        datatree['/Freeze_Thaw_Retrieval_Data_Global/am_pm'] = data_array
+    data_set = xr.Dataset(datatree['/Freeze_Thaw_Retrieval_Data_Global'])
+    data_array = data_set['am_pm']
+    datatree['/Freeze_Thaw_Retrieval_Data_Global/am_pm'] = data_array
 
-        data_array = data_set['y'].assign_attrs(
-            corner_point_offsets='history_subset_index_ranges'
-        )
-        datatree['/Freeze_Thaw_Retrieval_Data_Global/y'] = data_array
+    data_array = data_set['y'].assign_attrs(
+        corner_point_offsets='history_subset_index_ranges'
+    )
+    datatree['/Freeze_Thaw_Retrieval_Data_Global/y'] = data_array
 
-        data_array = data_set['x'].assign_attrs(
-            corner_point_offsets='history_subset_index_ranges'
-        )
-        datatree['/Freeze_Thaw_Retrieval_Data_Global/x'] = data_array
+    data_array = data_set['x'].assign_attrs(
+        corner_point_offsets='history_subset_index_ranges'
+    )
+    datatree['/Freeze_Thaw_Retrieval_Data_Global/x'] = data_array
 
-        dim_dict = get_dimension_index_map(
-            datatree,
-            [
-                '/Freeze_Thaw_Retrieval_Data_Global/am_pm',
-                '/Freeze_Thaw_Retrieval_Data_Global/y',
-                '/Freeze_Thaw_Retrieval_Data_Global/x',
-            ],
-            granule_varinfo,
-        )
+    dim_dict = get_dimension_index_map(
+        datatree,
+        [
+            '/Freeze_Thaw_Retrieval_Data_Global/am_pm',
+            '/Freeze_Thaw_Retrieval_Data_Global/y',
+            '/Freeze_Thaw_Retrieval_Data_Global/x',
+        ],
+        spl3ftp_varinfo,
+    )
 
-        assert dim_dict['/Freeze_Thaw_Retrieval_Data_Global/am_pm'] == 0
-        assert dim_dict['/Freeze_Thaw_Retrieval_Data_Global/y'] == 16
-        assert dim_dict['/Freeze_Thaw_Retrieval_Data_Global/x'] == 227
-
-        # If the dimension is not there, it will be a Key Error
-        with pytest.raises(MissingDimensionVariable):
-            dim_dict = get_dimension_index_map(
-                datatree,
-                [
-                    '/Freeze_Thaw_Retrieval_Data_Global/dim0',
-                ],
-                granule_varinfo,
-            )
-        # If the configuration is not there, it will return None
+    assert dim_dict['/Freeze_Thaw_Retrieval_Data_Global/am_pm'] == 0
+    assert dim_dict['/Freeze_Thaw_Retrieval_Data_Global/y'] == 16
+    assert dim_dict['/Freeze_Thaw_Retrieval_Data_Global/x'] == 227
+
+    # If the dimension is not there, it will be a Key Error
+    with pytest.raises(MissingDimensionVariable):
         dim_dict = get_dimension_index_map(
             datatree,
             [
-                '/Freeze_Thaw_Retrieval_Data_Global/am_pm',
+                '/Freeze_Thaw_Retrieval_Data_Global/dim0',
             ],
-            granule_varinfo,
+            spl3ftp_varinfo,
         )
-        assert dim_dict == {}
+
+    # A dimension in a missing group should also raise an exception
+    with pytest.raises(MissingDimensionVariable):
+        get_dimension_index_map(datatree, ['/missing_group/x'], spl3ftp_varinfo)
+
+    # If the configuration is not there, it will return None
+    dim_dict = get_dimension_index_map(
+        datatree,
+        [
+            '/Freeze_Thaw_Retrieval_Data_Global/am_pm',
+        ],
+        spl3ftp_varinfo,
+    )
+    assert dim_dict == {}
 
 
 def test_get_dim_index_from_variable_dimension_map() -> None:
@@ -1,6 +1,10 @@
 """Test functions in harmony_service.utilities."""
 
-from harmony_service.utilities import get_mimetype
+from datetime import datetime
+
+from pystac import Asset, Item
+
+from harmony_service.utilities import get_data_asset, get_mimetype
 
 
 def test_get_mimetype_known():
@@ -16,3 +20,19 @@ def test_get_mimetype_netcdf4():
 def test_get_mimetype_unknown():
     """Default of application/octet-stream when completely unknown."""
     assert get_mimetype('file.unknown') == 'application/octet-stream'
+
+
+def test_get_data_asset():
+    """The first asset with a 'data' role should be returned."""
+    item = Item(
+        id='input granule',
+        bbox=None,
+        geometry=None,
+        datetime=datetime(2000, 1, 2, 3, 4, 5),
+        properties={},
+    )
+    item.add_asset('metadata', Asset('metadata.xml', roles=['metadata']))
+    item.add_asset('no roles', Asset('unknown.txt'))
+    item.add_asset('input data', Asset('data.nc4', roles=['data']))
+
+    assert get_data_asset(item).href == 'data.nc4'
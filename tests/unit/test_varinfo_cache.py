@@ -0,0 +1,142 @@
+"""Tests for metadata_annotator.varinfo_cache.py."""
+
+from os import utime
+from os.path import getmtime
+from shutil import copy
+
+import pytest
+from varinfo import CFConfig
+from varinfo.exceptions import MissingConfigurationFileError
+from varinfo.var_info import VarInfoBase
+
+from metadata_annotator.varinfo_cache import (
+    CachedCFConfig,
+    CachedVarInfoFromNetCDF4,
+    collection_has_rules,
+    get_cf_config,
+    read_varinfo_config,
+)
+
+
+def test_cached_varinfo_reuses_configuration(sample_netcdf4_file, varinfo_config_file):
+    """Ensure the parsed configuration is shared between instances."""
+    read_varinfo_config.cache_clear()
+    get_cf_config.cache_clear()
+
+    first_varinfo = CachedVarInfoFromNetCDF4(
+        sample_netcdf4_file, short_name='TEST01', config_file=varinfo_config_file
+    )
+    second_varinfo = CachedVarInfoFromNetCDF4(
+        sample_netcdf4_file, short_name='TEST01', config_file=varinfo_config_file
+    )
+
+    assert first_varinfo.var_info_config is second_varinfo.var_info_config
+    assert first_varinfo.cf_config is second_varinfo.cf_config
+    assert read_varinfo_config.cache_info().misses == 1
+    assert get_cf_config.cache_info().misses == 1
+
+    # The cached configuration should be the same as that parsed directly:
+    expected_cf_config = CFConfig('TEST_MISSION', 'TEST01', varinfo_config_file)
+    assert first_varinfo.cf_config.metadata_overrides == (
+        expected_cf_config.metadata_overrides
+    )
+    assert first_varinfo.variables.keys() == {
+        '/variable_one',
+        '/variable_three',
+        '/sub_group/variable_two',
+        '/sub_group/variable_four',
+    }
+
+
+@pytest.mark.parametrize('method_name', ['_set_var_info_config', '_set_cf_config'])
+def test_cached_varinfo_overridden_methods(
+    method_name, sample_netcdf4_file, varinfo_config_file, mocker
+):
+    """Ensure the overridden private methods are still used by earthdata-varinfo.
+
+    If a new earthdata-varinfo release renames or stops calling either method,
+    the configuration would silently no longer be cached.
+
+    """
+    assert method_name in vars(VarInfoBase)
+    method_spy = mocker.spy(CachedVarInfoFromNetCDF4, method_name)
+
+    CachedVarInfoFromNetCDF4(
+        sample_netcdf4_file, short_name='TEST01', config_file=varinfo_config_file
+    )
+
+    method_spy.assert_called_once()
+
+
+def test_cached_varinfo_configuration_file_changed(
+    sample_netcdf4_file, varinfo_config_file, tmp_path
+):
+    """Ensure the configuration is re-read if the file has been modified.
+
+    The session-scoped configuration file is shared with other tests, so a
+    copy of it is modified instead.
+
+    """
+    config_file = str(copy(varinfo_config_file, tmp_path))
+    first_varinfo = CachedVarInfoFromNetCDF4(
+        sample_netcdf4_file, short_name='TEST01', config_file=config_file
+    )
+
+    modification_time = getmtime(config_file) + 10
+    utime(config_file, (modification_time, modification_time))
+
+    second_varinfo = CachedVarInfoFromNetCDF4(
+        sample_netcdf4_file, short_name='TEST01', config_file=config_file
+    )
+
+    assert first_varinfo.cf_config is not second_varinfo.cf_config
+
+
+def test_cached_varinfo_missing_configuration_file(sample_netcdf4_file):
+    """Ensure a missing configuration file still raises the expected exception."""
+    with pytest.raises(MissingConfigurationFileError):
+        CachedVarInfoFromNetCDF4(
+            sample_netcdf4_file, short_name='TEST01', config_file='missing.json'
+        )
+
+
+def test_cached_varinfo_no_configuration_file(sample_netcdf4_file):
+    """Ensure no configuration file can be used, as with VarInfoFromNetCDF4."""
+    varinfo = CachedVarInfoFromNetCDF4(sample_netcdf4_file, short_name='TEST01')
+    assert varinfo.var_info_config == {}
+    assert varinfo.cf_config.metadata_overrides == {}
+
+
+def test_cached_cf_config_metadata_overrides(varinfo_config_file, mocker):
+    """Ensure the overrides for a path are only determined once."""
+    cf_config = CachedCFConfig('TEST_MISSION', 'TEST01', varinfo_config_file)
+    expected_cf_config = CFConfig('TEST_MISSION', 'TEST01', varinfo_config_file)
+    parent_get_overrides_spy = mocker.spy(CFConfig, 'get_metadata_overrides')
+
+    first_overrides = cf_config.get_metadata_overrides('/variable_one')
+    second_overrides = cf_config.get_metadata_overrides('/variable_one')
+
+    assert first_overrides is second_overrides
+    assert first_overrides == expected_cf_config.get_metadata_overrides('/variable_one')
+    # One call for the cached instance, one for the expected instance:
+    assert parent_get_overrides_spy.call_count == 2
+
+
+@pytest.mark.parametrize(
+    'short_name, expected_result',
+    [
+        ('TEST01', True),
+        ('TEST05', True),
+        ('TEST99', False),
+        ('OTHER_SHORT_NAME', False),
+    ],
+)
+def test_collection_has_rules(varinfo_config_file, short_name, expected_result):
+    """Ensure collections with overrides or exclusions are identified."""
+    assert collection_has_rules(varinfo_config_file, short_name) == expected_result
+
+
+@pytest.mark.parametrize('config_file', [None, 'missing.json', 'config.yml'])
+def test_collection_has_rules_unreadable_configuration(config_file):
+    """Ensure granules are fully parsed if the configuration cannot be read."""
+    assert collection_has_rules(config_file, 'TEST01')